@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+
+from .settings import settings
+
+# 같은 사용자의 동일한 GET 이 동시에 들어오면 한 번만 계산해서 결과를 나눠준다
+COALESCED_PATHS = (
+    "/api/levels/status",
+    "/api/cards/today",
+    "/api/cards/quiz",
+    "/api/cards/remind",
+    "/api/cards/next",
+)
+
+# 사용자별 동시 실행 수 + token bucket 제한 대상 (JSON body 의 user_id 기준)
+LIMITED_WRITE_PATHS = (
+    "/api/review",
+    "/api/review/quiz",
+    "/api/sync",
+    "/api/levels/day/open",
+    "/api/levels/day/complete",
+    "/api/levels/cycle/confirm",
+)
+
+_MAX_TRACKED_USERS = 10000
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+        self.done = asyncio.Event()
+        self.ok = False
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> float:
+        """Consume a token; returns 0 on success, otherwise seconds until one is available."""
+        self.refill(time.monotonic())
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class WriteLimiter:
+    """Per-user write token buckets, shared by HTTP writes and the study WebSocket.
+
+    Like the rest of this module, state is per worker process.
+    """
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, _TokenBucket] = {}
+
+    def take(self, user_id: int) -> float:
+        """Consume one of the user's tokens; returns 0 on success, otherwise seconds to wait."""
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            self._prune()
+            bucket = self.buckets[user_id] = _TokenBucket(settings.write_rate_per_second, settings.write_burst)
+        return bucket.take()
+
+    def _prune(self) -> None:
+        if len(self.buckets) < _MAX_TRACKED_USERS:
+            return
+        now = time.monotonic()
+        for user_id, bucket in list(self.buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.burst:
+                del self.buckets[user_id]
+
+
+write_limiter = WriteLimiter()
+
+
+def _matches(path: str, candidates: tuple[str, ...]) -> bool:
+    # root_path(/voca) 유무와 관계없이 비교
+    return any(path == p or path.endswith(p) for p in candidates)
+
+
+async def _send_too_many(send, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Single-flight coalescing for hot GETs and per-user admission control for writes.
+
+    State lives in the worker process, so limits apply per uvicorn worker.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.flights: dict[tuple, _Flight] = {}
+        self.running: dict[int, int] = {}
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http":
+            method = scope["method"]
+            path = scope["path"]
+            if method == "GET" and _matches(path, COALESCED_PATHS):
+                await self._coalesce(scope, receive, send)
+                return
+            if method == "POST" and _matches(path, LIMITED_WRITE_PATHS):
+                await self._admit(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+    async def _coalesce(self, scope, receive, send) -> None:
+        query = scope.get("query_string", b"")
+        if b"user_id=" not in query:
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["path"], query)
+        flight = self.flights.get(key)
+        if flight is not None:
+            await flight.done.wait()
+            if flight.ok:
+                for message in flight.messages:
+                    await send(message)
+                return
+            # 선행 요청이 실패하면 각자 다시 실행
+            await self.app(scope, receive, send)
+            return
+
+        flight = _Flight()
+        self.flights[key] = flight
+
+        async def recording_send(message) -> None:
+            flight.messages.append(message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, recording_send)
+            flight.ok = True
+        finally:
+            del self.flights[key]
+            flight.done.set()
+
+    async def _admit(self, scope, receive, send) -> None:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                # 클라이언트 연결 종료
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            user_id = int(json.loads(body).get("user_id"))
+        except (ValueError, TypeError, AttributeError):
+            # 검증 에러는 FastAPI 가 422 로 처리
+            await self.app(scope, replay_receive, send)
+            return
+
+        if self.running.get(user_id, 0) >= settings.write_max_concurrent_per_user:
+            await _send_too_many(send, "too many concurrent requests", 1)
+            return
+
+        wait = write_limiter.take(user_id)
+        if wait > 0:
+            await _send_too_many(send, "rate limit exceeded", wait)
+            return
+
+        self.running[user_id] = self.running.get(user_id, 0) + 1
+        try:
+            await self.app(scope, replay_receive, send)
+        finally:
+            self.running[user_id] -= 1
+            if not self.running[user_id]:
+                del self.running[user_id]
+
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import zlib
+from datetime import date, datetime
+
+from sqlalchemy import and_, delete, exists, select
+from sqlalchemy.orm import Session
+
+from .models import LevelCycle, UserProgress, UserProgressArchive, Vocab
+
+ARCHIVE_COLUMNS = (
+    "vocab_id",
+    "leitner_level",
+    "next_review_date",
+    "is_mastered",
+    "last_reviewed_at",
+    "correct_streak",
+    "wrong_count",
+    "interval_days",
+    "ease_factor",
+    "stability",
+    "difficulty",
+    "created_at",
+    "updated_at",
+)
+
+
+def _encode(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_rows(rows: list[list]) -> bytes:
+    body = json.dumps({"columns": ARCHIVE_COLUMNS, "rows": rows}, separators=(",", ":"))
+    return zlib.compress(body.encode("utf-8"), 9)
+
+
+def decode_rows(payload: bytes) -> list[dict]:
+    data = json.loads(zlib.decompress(payload).decode("utf-8"))
+    columns = data["columns"]
+    return [dict(zip(columns, row)) for row in data["rows"]]
+
+
+def _pending_cycles(db: Session, *, limit: int | None):
+    # 확정된 사이클 중 아직 hot 테이블에 행이 남아 있는 것
+    has_rows = exists().where(
+        and_(
+            UserProgress.user_id == LevelCycle.user_id,
+            UserProgress.cycle_no == LevelCycle.cycle_no,
+            UserProgress.vocab_id == Vocab.id,
+            Vocab.difficulty_level == LevelCycle.difficulty_level,
+        )
+    )
+    stmt = (
+        select(LevelCycle.user_id, LevelCycle.difficulty_level, LevelCycle.cycle_no)
+        .where(and_(LevelCycle.status == "completed_confirmed", has_rows))
+        .order_by(LevelCycle.id.asc())
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return db.execute(stmt).all()
+
+
+def archive_cycle(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> int:
+    """Move one confirmed cycle's progress rows into the archive. Caller commits."""
+    rows = db.execute(
+        select(UserProgress.id, *(getattr(UserProgress, c) for c in ARCHIVE_COLUMNS))
+        .join(Vocab, UserProgress.vocab_id == Vocab.id)
+        .where(
+            and_(
+                UserProgress.user_id == user_id,
+                UserProgress.cycle_no == cycle_no,
+                Vocab.difficulty_level == difficulty_level,
+            )
+        )
+        .order_by(UserProgress.vocab_id.asc())
+    ).all()
+    if not rows:
+        return 0
+
+    ids = [r[0] for r in rows]
+    encoded = [[_encode(v) for v in r[1:]] for r in rows]
+
+    archive = db.execute(
+        select(UserProgressArchive).where(
+            and_(
+                UserProgressArchive.user_id == user_id,
+                UserProgressArchive.difficulty_level == difficulty_level,
+                UserProgressArchive.cycle_no == cycle_no,
+            )
+        )
+    ).scalar_one_or_none()
+    if archive is None:
+        archive = UserProgressArchive(user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle_no)
+        db.add(archive)
+    else:
+        # 중단 후 재실행 등으로 남은 행은 기존 보관분에 합친다 (vocab_id 기준 최신 우선)
+        # 컬럼이 추가되기 전에 보관된 행은 없는 값을 None 으로 채운다
+        merged = {row["vocab_id"]: [row.get(c) for c in ARCHIVE_COLUMNS] for row in decode_rows(archive.payload)}
+        merged.update({row[0]: row for row in encoded})
+        encoded = [merged[k] for k in sorted(merged)]
+
+    mastered_idx = ARCHIVE_COLUMNS.index("is_mastered")
+    archive.payload = encode_rows(encoded)
+    archive.row_count = len(encoded)
+    archive.mastered_count = sum(1 for row in encoded if row[mastered_idx])
+    archive.archived_at = datetime.utcnow()
+
+    db.execute(delete(UserProgress).where(UserProgress.id.in_(ids)))
+    return len(ids)
+
+
+def archive_confirmed_cycles(db: Session, *, limit: int | None = None) -> tuple[int, int]:
+    """Archive every pending confirmed cycle, one transaction each. Returns (cycles, rows)."""
+    cycles = 0
+    moved = 0
+    for user_id, difficulty_level, cycle_no in _pending_cycles(db, limit=limit):
+        moved += archive_cycle(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle_no)
+        db.commit()
+        cycles += 1
+    return cycles, moved
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .db import engine
+from .models import CacheInvalidation
+from .settings import settings
+
+# 무효화 키는 ':' 로 구분된 계층 구조. "user:3:level:600" 을 무효화하면
+# "user:3:level:600:cycle" 처럼 그 아래의 모든 항목이 같이 지워진다.
+_PENDING_KEY = "cache_invalidations"
+
+
+def _matches(key: str, invalidated: str) -> bool:
+    return key == invalidated or key.startswith(invalidated + ":")
+
+
+class InvalidationTransport:
+    """Carries invalidated keys between worker processes."""
+
+    def publish(self, keys: list[str]) -> None:
+        raise NotImplementedError
+
+    def poll(self) -> list[str]:
+        raise NotImplementedError
+
+
+class TableTransport(InvalidationTransport):
+    """Workers append to a shared change table and poll for rows past their last seen id."""
+
+    def __init__(self, engine: Engine, *, retention: timedelta = timedelta(minutes=10)):
+        self.engine = engine
+        self.retention = retention
+        self.last_id: int | None = None
+
+    def publish(self, keys: list[str]) -> None:
+        now = datetime.utcnow()
+        with self.engine.begin() as conn:
+            conn.execute(insert(CacheInvalidation), [{"key": k, "created_at": now} for k in keys])
+            conn.execute(delete(CacheInvalidation).where(CacheInvalidation.created_at < now - self.retention))
+
+    def poll(self) -> list[str]:
+        with self.engine.connect() as conn:
+            if self.last_id is None:
+                # 시작 시점 이전의 변경은 볼 필요가 없다 (캐시가 비어 있음)
+                self.last_id = int(conn.execute(select(func.max(CacheInvalidation.id))).scalar_one() or 0)
+                return []
+            rows = conn.execute(
+                select(CacheInvalidation.id, CacheInvalidation.key)
+                .where(CacheInvalidation.id > self.last_id)
+                .order_by(CacheInvalidation.id.asc())
+            ).all()
+        if rows:
+            self.last_id = rows[-1].id
+        return [r.key for r in rows]
+
+
+class UnixSocketTransport(InvalidationTransport):
+    """Each worker binds a datagram socket in a shared directory; publish sends to all peers."""
+
+    def __init__(self, socket_dir: str | Path):
+        self.socket_dir = Path(socket_dir)
+        self.socket_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.socket_dir / f"{os.getpid()}.sock"
+        self.path.unlink(missing_ok=True)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(str(self.path))
+        self.sock.setblocking(False)
+
+    def publish(self, keys: list[str]) -> None:
+        message = "\n".join(keys).encode("utf-8")
+        for peer in self.socket_dir.glob("*.sock"):
+            if peer == self.path:
+                continue
+            try:
+                self.sock.sendto(message, str(peer))
+            except (ConnectionRefusedError, FileNotFoundError):
+                # 종료된 워커의 소켓 파일
+                peer.unlink(missing_ok=True)
+            except BlockingIOError:
+                # 수신 버퍼가 가득 찬 워커는 TTL 로 복구된다
+                pass
+
+    def poll(self) -> list[str]:
+        keys: list[str] = []
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                return keys
+            keys.extend(k for k in data.decode("utf-8").split("\n") if k)
+
+
+class Cache:
+    """Process-local TTL cache kept coherent across workers by an invalidation transport."""
+
+    def __init__(self, transport: InvalidationTransport, *, ttl: float, poll_interval: float):
+        self.transport = transport
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._next_poll = 0.0
+        # 로딩 중에 무효화가 들어오면 그 결과는 저장하지 않는다
+        self._generation = 0
+
+    def _drop(self, keys: list[str]) -> None:
+        self._generation += 1
+        for key in list(self._entries):
+            if any(_matches(key, k) for k in keys):
+                del self._entries[key]
+
+    def _sync(self, now: float) -> None:
+        if now < self._next_poll:
+            return
+        self._next_poll = now + self.poll_interval
+        keys = self.transport.poll()
+        if keys:
+            self._drop(keys)
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            self._sync(now)
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] > now:
+                return hit[1]
+            generation = self._generation
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            self._drop(list(keys))
+        self.transport.publish(list(keys))
+
+    def invalidate_after_commit(self, session: Session, *keys: str) -> None:
+        # 커밋 전에 알리면 다른 워커가 이전 값을 다시 캐시할 수 있다
+        session.info.setdefault(_PENDING_KEY, set()).update(keys)
+
+
+class NullCache:
+    """Used when caching is off (the default): every lookup goes to the loader."""
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        return loader()
+
+    def invalidate(self, *keys: str) -> None:
+        pass
+
+    def invalidate_after_commit(self, session: Session, *keys: str) -> None:
+        pass
+
+
+def build_cache() -> Cache | NullCache:
+    if not settings.cache_enabled:
+        return NullCache()
+
+    if settings.cache_transport == "uds":
+        transport: InvalidationTransport = UnixSocketTransport(settings.cache_socket_dir)
+    elif settings.cache_transport == "table":
+        transport = TableTransport(engine)
+    else:
+        raise ValueError(f"unknown cache_transport: {settings.cache_transport}")
+
+    return Cache(transport, ttl=settings.cache_ttl_seconds, poll_interval=settings.cache_poll_interval_seconds)
+
+
+cache = build_cache()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    keys = session.info.pop(_PENDING_KEY, None)
+    if keys:
+        cache.invalidate(*sorted(keys))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,10 +1,151 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import hashlib
+from collections.abc import Iterator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
 
 from .settings import settings
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 사용자별 학습 상태 테이블: SHARD_COUNT > 0 이면 user_id 해시로 shard DB 에 나뉜다.
+# 나머지(users, vocab, ...)는 catalog DB(database_url)에 남는다.
+SHARDED_TABLES = frozenset(
+    {
+        "user_progress",
+        "study_logs",
+        "level_cycles",
+        "level_day_progress",
+        "user_sync_state",
+        "sync_receipts",
+        "user_progress_archive",
+        "user_scores",
+    }
+)
+
+
+def _make_engine(url: str, *, read_only: bool = False, attach_catalog: bool = False):
+    eng = create_engine(url, pool_pre_ping=True)
+
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        if eng.dialect.name == "sqlite":
+            # WAL: 읽기 트랜잭션이 쓰기를 막지 않는다
+            cursor.execute("PRAGMA journal_mode=WAL")
+            if attach_catalog:
+                # shard 연결에서도 vocab/users 를 그대로 JOIN 할 수 있도록
+                cursor.execute("ATTACH DATABASE ? AS catalog", (make_url(settings.database_url).database,))
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        elif read_only:
+            # 트랜잭션 안의 SET 은 rollback 되면 사라지므로 autocommit 으로 연결에 고정한다
+            autocommit = dbapi_conn.autocommit
+            dbapi_conn.autocommit = True
+            try:
+                cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
+            finally:
+                dbapi_conn.autocommit = autocommit
+        cursor.close()
+
+    return eng
+
+
+def _writes_catalog(mapper, clause) -> bool:
+    # INSERT/UPDATE/DELETE 는 대상 테이블, flush 는 mapper 로 판단한다
+    table = getattr(clause, "table", None) if clause is not None else None
+    if table is None and clause is None and mapper is not None:
+        table = mapper.local_table
+    return table is not None and table.name not in SHARDED_TABLES
+
+
+class RoutingSession(Session):
+    """Session that talks to the catalog DB until it is pinned to a user's shard.
+
+    Once pinned, reads go to the shard (catalog tables stay JOINable through
+    the ATTACHed catalog). Writes to catalog tables still go to the catalog
+    engine, so they never run inside a shard transaction.
+    """
+
+    def __init__(self, *args, catalog_bind, shard_binds, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.catalog_bind = catalog_bind
+        self.shard_binds = shard_binds
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        shard = self.info.get("shard")
+        if shard is None or _writes_catalog(mapper, clause):
+            return self.catalog_bind
+        return self.shard_binds[shard]
+
+
+def shard_for_user(user_id: int, shard_count: int | None = None) -> int:
+    # 프로세스마다 달라지는 hash() 대신 고정 해시 (연속된 id 도 고르게 퍼진다)
+    count = settings.shard_count if shard_count is None else shard_count
+    digest = hashlib.blake2b(str(user_id).encode("ascii"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def shard_url(shard: int) -> str:
+    return settings.shard_url_template.format(shard=shard)
+
+
+if settings.shard_count and make_url(settings.database_url).get_backend_name() != "sqlite":
+    raise RuntimeError("SHARD_COUNT requires a SQLite catalog database")
+
+engine = _make_engine(settings.database_url)
+shard_engines = [_make_engine(shard_url(i), attach_catalog=True) for i in range(settings.shard_count)]
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    catalog_bind=engine,
+    shard_binds=shard_engines,
+    autocommit=False,
+    autoflush=False,
+)
+
+# GET 핸들러 전용 (쓰기 시도 시 DB 가 에러를 낸다)
+read_engine = _make_engine(settings.database_url, read_only=True)
+read_shard_engines = [
+    _make_engine(shard_url(i), read_only=True, attach_catalog=True) for i in range(settings.shard_count)
+]
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    catalog_bind=read_engine,
+    shard_binds=read_shard_engines,
+    autocommit=False,
+    autoflush=False,
+)
+
+
+def use_user_shard(session: Session, user_id: int) -> None:
+    """Pin the session to the user's shard. Must run before the session's first query."""
+    if not settings.shard_count:
+        return
+    shard = shard_for_user(user_id)
+    current = session.info.get("shard")
+    if current is not None and current != shard:
+        raise RuntimeError("session is already bound to another user's shard")
+    if current is None and session.in_transaction():
+        raise RuntimeError("use_user_shard must be called before the first query")
+    session.info["shard"] = shard
+
+
+def shard_sessions(*, read_only: bool = False) -> Iterator[Session]:
+    """One session per shard for batch jobs (the catalog session when sharding is off)."""
+    factory = ReadSessionLocal if read_only else SessionLocal
+    for shard in range(settings.shard_count) or [None]:
+        with factory() as db:
+            if shard is not None:
+                db.info["shard"] = shard
+            yield db
+
+
+def dialect_insert(session: Session, table):
+    """INSERT construct with ON CONFLICT support for the session's dialect."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql_insert(table)
+    return sqlite_insert(table)
 
 
 def get_db():
@@ -13,3 +154,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
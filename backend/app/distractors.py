@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from collections import defaultdict
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection
+
+from .models import Vocab, VocabDistractor
+
+# 카드마다 저장해 두는 오답 후보 수 (요청 시에는 이 중 QUIZ_DISTRACTORS 개를 뽑는다)
+DISTRACTOR_CANDIDATES = 8
+QUIZ_DISTRACTORS = 3
+
+_POS_SUFFIXES = (
+    ("adv", ("ly",)),
+    ("noun", ("tion", "sion", "ment", "ness", "ity", "ance", "ence", "ship", "er", "or", "ist")),
+    ("verb", ("ize", "ise", "ate", "ify", "en")),
+    ("adj", ("ous", "ive", "al", "able", "ible", "ful", "less", "ic", "ary", "ant", "ent")),
+)
+
+
+def guess_pos(word: str) -> str | None:
+    # CSV에 품사 컬럼이 없어서 영어 접미사로 대략 추정한다.
+    w = word.strip().lower()
+    if " " in w:
+        return "phrase"
+    for pos, suffixes in _POS_SUFFIXES:
+        if any(w.endswith(s) and len(w) > len(s) + 2 for s in suffixes):
+            return pos
+    return None
+
+
+def _rank_candidates(row, *, by_topic, by_pos, by_day, k: int) -> list[int]:
+    vocab_id, day, topic, pos, meaning = row
+    picked: list[int] = []
+    seen = {vocab_id}
+    seen_meanings = {meaning}
+
+    def take(candidate) -> bool:
+        cid, _, _, _, cmeaning = candidate
+        if cid in seen or cmeaning in seen_meanings:
+            return False
+        seen.add(cid)
+        seen_meanings.add(cmeaning)
+        picked.append(cid)
+        return len(picked) >= k
+
+    def by_day_distance(candidates):
+        return sorted(candidates, key=lambda c: (abs((c[1] or 0) - (day or 0)), c[0]))
+
+    # 1) same topic, 2) same part of speech, 3) nearest days in the level
+    pools = []
+    if topic:
+        pools.append(by_day_distance(by_topic.get(topic, [])))
+    if pos:
+        pools.append(by_day_distance(by_pos.get(pos, [])))
+    for pool in pools:
+        for candidate in pool:
+            if take(candidate):
+                return picked
+
+    days = sorted(by_day, key=lambda d: (abs((d or 0) - (day or 0)), d or 0))
+    for d in days:
+        for candidate in by_day[d]:
+            if take(candidate):
+                return picked
+    return picked
+
+
+def rebuild_distractors(conn: Connection, *, k: int = DISTRACTOR_CANDIDATES) -> int:
+    """Recompute the distractor table for every vocab row. Returns rows written."""
+    rows = conn.execute(
+        select(Vocab.id, Vocab.difficulty_level, Vocab.day, Vocab.topic, Vocab.word, Vocab.meaning).order_by(
+            Vocab.id.asc()
+        )
+    ).all()
+
+    levels: dict[str | None, list[tuple]] = defaultdict(list)
+    for vocab_id, level, day, topic, word, meaning in rows:
+        levels[level].append((vocab_id, day, topic, guess_pos(word), meaning.strip()))
+
+    conn.execute(delete(VocabDistractor))
+
+    written = 0
+    for level_rows in levels.values():
+        by_topic: dict[str, list[tuple]] = defaultdict(list)
+        by_pos: dict[str, list[tuple]] = defaultdict(list)
+        by_day: dict[int | None, list[tuple]] = defaultdict(list)
+        for r in level_rows:
+            if r[2]:
+                by_topic[r[2]].append(r)
+            if r[3]:
+                by_pos[r[3]].append(r)
+            by_day[r[1]].append(r)
+
+        batch = []
+        for r in level_rows:
+            ranked = _rank_candidates(r, by_topic=by_topic, by_pos=by_pos, by_day=by_day, k=k)
+            batch.extend(
+                {"vocab_id": r[0], "rank": rank, "distractor_id": cid} for rank, cid in enumerate(ranked, start=1)
+            )
+
+        if batch:
+            conn.execute(insert(VocabDistractor), batch)
+            written += len(batch)
+
+    return written
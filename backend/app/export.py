@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from .archive import decode_rows
+from .db import ReadSessionLocal, shard_sessions, use_user_shard
+from .models import StudyLog, UserProgress, UserProgressArchive, Vocab
+
+BATCH_SIZE = 5_000
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+_STUDY_LOG_COLUMNS = (
+    StudyLog.id,
+    StudyLog.user_id,
+    StudyLog.vocab_id,
+    StudyLog.difficulty_level,
+    StudyLog.cycle_no,
+    StudyLog.result,
+    StudyLog.studied_at,
+)
+_PROGRESS_COLUMNS = (
+    UserProgress.id,
+    UserProgress.user_id,
+    UserProgress.vocab_id,
+    Vocab.difficulty_level,
+    UserProgress.cycle_no,
+    UserProgress.leitner_level,
+    UserProgress.next_review_date,
+    UserProgress.is_mastered,
+    UserProgress.last_reviewed_at,
+    UserProgress.correct_streak,
+    UserProgress.wrong_count,
+    UserProgress.interval_days,
+    UserProgress.ease_factor,
+    UserProgress.stability,
+    UserProgress.difficulty,
+    UserProgress.created_at,
+    UserProgress.updated_at,
+    UserProgress.change_seq,
+)
+COLUMNS = {
+    "study_logs": tuple(c.key for c in _STUDY_LOG_COLUMNS),
+    "user_progress": tuple(c.key for c in _PROGRESS_COLUMNS),
+}
+
+
+def _statement(table: str, *, user_id, difficulty_level, cycle_no, since, until, batch_size: int):
+    if table == "study_logs":
+        stmt = select(*_STUDY_LOG_COLUMNS)
+        level_col, cycle_col, time_col, user_col, order = (
+            StudyLog.difficulty_level,
+            StudyLog.cycle_no,
+            StudyLog.studied_at,
+            StudyLog.user_id,
+            StudyLog.id,
+        )
+    elif table == "user_progress":
+        stmt = select(*_PROGRESS_COLUMNS).select_from(UserProgress).join(Vocab, UserProgress.vocab_id == Vocab.id)
+        level_col, cycle_col, time_col, user_col, order = (
+            Vocab.difficulty_level,
+            UserProgress.cycle_no,
+            UserProgress.updated_at,
+            UserProgress.user_id,
+            UserProgress.id,
+        )
+    else:
+        raise ValueError(f"unknown export table: {table}")
+
+    conds = []
+    if user_id is not None:
+        conds.append(user_col == user_id)
+    if difficulty_level is not None:
+        conds.append(level_col == difficulty_level)
+    if cycle_no is not None:
+        conds.append(cycle_col == cycle_no)
+    if since is not None:
+        conds.append(time_col >= since)
+    if until is not None:
+        conds.append(time_col < until)
+    if conds:
+        stmt = stmt.where(and_(*conds))
+    # yield_per: 서버 측 커서로 batch_size 행씩만 메모리에 둔다
+    return stmt.order_by(order.asc()).execution_options(yield_per=batch_size)
+
+
+def _archived_progress(db: Session, *, user_id, difficulty_level, cycle_no, since, until) -> Iterator[list[tuple]]:
+    # cold 테이블은 사이클 단위 압축본이라 한 사이클씩 풀어서 내보낸다 (id/change_seq 는 없음)
+    conds = []
+    if user_id is not None:
+        conds.append(UserProgressArchive.user_id == user_id)
+    if difficulty_level is not None:
+        conds.append(UserProgressArchive.difficulty_level == difficulty_level)
+    if cycle_no is not None:
+        conds.append(UserProgressArchive.cycle_no == cycle_no)
+    stmt = select(
+        UserProgressArchive.user_id,
+        UserProgressArchive.difficulty_level,
+        UserProgressArchive.cycle_no,
+        UserProgressArchive.payload,
+    ).order_by(UserProgressArchive.id.asc())
+    if conds:
+        stmt = stmt.where(and_(*conds))
+
+    for archive in db.execute(stmt.execution_options(yield_per=16)):
+        batch = []
+        for row in decode_rows(archive.payload):
+            updated_at = datetime.fromisoformat(row["updated_at"])
+            if (since is not None and updated_at < since) or (until is not None and updated_at >= until):
+                continue
+            values = {
+                **row,
+                "user_id": archive.user_id,
+                "difficulty_level": archive.difficulty_level,
+                "cycle_no": archive.cycle_no,
+            }
+            batch.append(tuple(values.get(name) for name in COLUMNS["user_progress"]))
+        if batch:
+            yield batch
+
+
+def _sessions(user_id: int | None) -> Iterator[Session]:
+    if user_id is None:
+        yield from shard_sessions(read_only=True)
+        return
+    # 한 사용자만이면 그 사용자의 shard 하나만 읽는다
+    with ReadSessionLocal() as db:
+        use_user_shard(db, user_id)
+        yield db
+
+
+def export_batches(
+    table: str,
+    *,
+    user_id: int | None = None,
+    difficulty_level: str | None = None,
+    cycle_no: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    include_archived: bool = False,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[list[tuple]]:
+    """Rows of the table in batches of at most batch_size, shard by shard."""
+    filters = dict(user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle_no, since=since, until=until)
+    stmt = _statement(table, batch_size=batch_size, **filters)
+    for db in _sessions(user_id):
+        for rows in db.execute(stmt).partitions():
+            yield [tuple(row) for row in rows]
+        if include_archived and table == "user_progress":
+            yield from _archived_progress(db, **filters)
+
+
+def _encode(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson(columns: tuple[str, ...], batches: Iterable[list[tuple]]) -> Iterator[bytes]:
+    for batch in batches:
+        lines = [
+            json.dumps(dict(zip(columns, map(_encode, row))), ensure_ascii=False, separators=(",", ":"))
+            for row in batch
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _csv(columns: tuple[str, ...], batches: Iterable[list[tuple]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([[int(v) if isinstance(v, bool) else _encode(v) for v in row] for row in batch])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], *, level: int = 6) -> Iterator[bytes]:
+    # wbits=31: gzip 헤더/트레일러 (gunzip, pandas 에서 바로 읽힌다)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def export_stream(table: str, fmt: str, *, gzip: bool = False, **filters) -> Iterator[bytes]:
+    """Encoded export body; memory stays at one batch whatever the table size."""
+    if table not in COLUMNS:
+        raise ValueError(f"unknown export table: {table}")
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format: {fmt}")
+    encode = _ndjson if fmt == "ndjson" else _csv
+    chunks = encode(COLUMNS[table], export_batches(table, **filters))
+    return gzip_chunks(chunks) if gzip else chunks
+
+
+def export_filename(table: str, fmt: str, *, gzip: bool = False) -> str:
+    return f"{table}.{fmt}" + (".gz" if gzip else "")
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.orm import Session
+
+from .db import shard_sessions
+from .models import LevelCycle, UserProgress, Vocab
+from .settings import settings
+
+FORECAST_DAYS = 30
+_PENDING_KEY = "forecast_moves"
+
+
+def due_counts(
+    db: Session,
+    *,
+    end: date,
+    user_id: int | None = None,
+    difficulty_level: str | None = None,
+) -> list[tuple[str, date, int]]:
+    """(level, next_review_date, cards) for unmastered cards of open cycles due before end.
+
+    One grouped query; ix_user_progress_forecast covers the user_progress side.
+    Overdue dates are returned as-is (callers fold them into today).
+    """
+    conds = [
+        UserProgress.is_mastered.is_(False),
+        UserProgress.next_review_date.is_not(None),
+        UserProgress.next_review_date < end,
+        LevelCycle.status.in_(["active", "completed_pending_confirm"]),
+    ]
+    if user_id is not None:
+        conds.append(UserProgress.user_id == user_id)
+    if difficulty_level is not None:
+        conds.append(Vocab.difficulty_level == difficulty_level)
+
+    stmt = (
+        select(Vocab.difficulty_level, UserProgress.next_review_date, func.count())
+        .select_from(UserProgress)
+        .join(Vocab, UserProgress.vocab_id == Vocab.id)
+        # 확정이 끝난 이전 사이클 카드는 더 이상 복습하지 않는다
+        .join(
+            LevelCycle,
+            and_(
+                LevelCycle.user_id == UserProgress.user_id,
+                LevelCycle.difficulty_level == Vocab.difficulty_level,
+                LevelCycle.cycle_no == UserProgress.cycle_no,
+            ),
+        )
+        .where(and_(*conds))
+        .group_by(Vocab.difficulty_level, UserProgress.next_review_date)
+    )
+    return [(level, due, int(count)) for level, due, count in db.execute(stmt).tuples()]
+
+
+def daily_counts(rows: list[tuple[str, date, int]], *, start: date, days: int = FORECAST_DAYS) -> dict[str, list[int]]:
+    """Per-level due counts for start .. start+days-1; overdue cards count on day 0."""
+    counts: dict[str, list[int]] = {}
+    for level, due, count in rows:
+        offset = max(0, (due - start).days)
+        if offset < days:
+            counts.setdefault(level, [0] * days)[offset] += count
+    return counts
+
+
+class SystemForecast:
+    """System-wide due counts per (level, date), kept per worker.
+
+    Rebuilt from every shard when older than forecast_refresh_seconds or when
+    the day changes; in between, committed reviews move their card from the
+    old due date to the new one. Other workers' reviews show up on rebuild.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # 동시에 들어온 요청 중 하나만 전체 집계를 다시 한다 (나머지는 기다렸다가 결과를 쓴다)
+        self._rebuild_lock = threading.Lock()
+        self._counts: dict[tuple[str, date], int] = {}
+        self._start: date | None = None
+        self._built_at = 0.0
+
+    @property
+    def _end(self) -> date:
+        return self._start + timedelta(days=FORECAST_DAYS)
+
+    def rebuild(self) -> None:
+        start = date.today()
+        end = start + timedelta(days=FORECAST_DAYS)
+        counts: dict[tuple[str, date], int] = {}
+        for db in shard_sessions(read_only=True):
+            for level, due, count in due_counts(db, end=end):
+                key = (level, max(due, start))
+                counts[key] = counts.get(key, 0) + count
+
+        with self._lock:
+            self._counts = counts
+            self._start = start
+            self._built_at = time.monotonic()
+
+    def _stale(self) -> bool:
+        if self._start != date.today():
+            return True
+        return time.monotonic() - self._built_at > settings.forecast_refresh_seconds
+
+    def move(self, moves: list[tuple[str, date | None, date | None]]) -> None:
+        with self._lock:
+            if self._start is None:
+                return
+            for level, old, new in moves:
+                # None = 집계 대상 아님 (mastered 또는 예정일 없음)
+                if old is not None and old < self._end:
+                    key = (level, max(old, self._start))
+                    self._counts[key] = self._counts.get(key, 0) - 1
+                if new is not None and new < self._end:
+                    key = (level, max(new, self._start))
+                    self._counts[key] = self._counts.get(key, 0) + 1
+
+    def counts(self, *, difficulty_level: str | None = None) -> tuple[date, dict[str, list[int]]]:
+        if self._stale():
+            with self._rebuild_lock:
+                if self._stale():
+                    self.rebuild()
+        with self._lock:
+            rows = [
+                (level, due, count)
+                for (level, due), count in self._counts.items()
+                if difficulty_level is None or level == difficulty_level
+            ]
+            start = self._start
+        return start, daily_counts(rows, start=start)
+
+
+system_forecast = SystemForecast()
+
+
+def record_move(
+    db: Session,
+    *,
+    difficulty_level: str,
+    old_due: date | None,
+    was_mastered: bool,
+    new_due: date | None,
+    is_mastered: bool,
+) -> None:
+    """Remember a card's due-date change; applied to system_forecast after commit."""
+    old = None if was_mastered else old_due
+    new = None if is_mastered else new_due
+    if old != new:
+        db.info.setdefault(_PENDING_KEY, []).append((difficulty_level, old, new))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    moves = session.info.pop(_PENDING_KEY, None)
+    if moves:
+        system_forecast.move(moves)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
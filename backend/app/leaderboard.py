@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import case, event, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .db import ReadSessionLocal, dialect_insert, shard_sessions
+from .models import CohortMember, UserScore
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("mastered", "week_reviews")
+TOP_K = 100
+_PENDING_KEY = "leaderboard_updates"
+_PENDING_MEMBERS_KEY = "leaderboard_members"
+
+
+def week_start(day: date | None = None) -> date:
+    day = day or date.today()
+    return day - timedelta(days=day.weekday())
+
+
+class Score(NamedTuple):
+    user_id: int
+    difficulty_level: str
+    mastered: int
+    week_start: date
+    week_reviews: int
+
+
+class TopK:
+    """Every member's score plus the k best, kept sorted as (-score, user_id)."""
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.scores: dict[int, int] = {}
+        self.top: list[tuple[int, int]] = []
+
+    def set(self, user_id: int, score: int) -> None:
+        old = self.scores.get(user_id)
+        if old == score:
+            return
+        self.scores[user_id] = score
+        entry = (-score, user_id)
+
+        if old is not None:
+            old_entry = (-old, user_id)
+            i = bisect_left(self.top, old_entry)
+            if i < len(self.top) and self.top[i] == old_entry:
+                last = self.top[-1]
+                del self.top[i]
+                if entry <= last or len(self.scores) <= self.k:
+                    insort(self.top, entry)
+                else:
+                    # top 에서 밀려났다: 밖에 있던 누가 올라올지 모르므로 다시 계산 (점수가 줄 때만)
+                    self.top = heapq.nsmallest(self.k, ((-s, u) for u, s in self.scores.items()))
+                return
+
+        if len(self.top) < self.k or entry < self.top[-1]:
+            insort(self.top, entry)
+            del self.top[self.k :]
+
+    def best(self, limit: int) -> list[tuple[int, int]]:
+        return [(user_id, -neg) for neg, user_id in self.top[:limit]]
+
+
+class Leaderboards:
+    """Per-worker top-K boards keyed by (cohort_id or None, level, metric).
+
+    Built from user_scores at startup, updated after each committed review,
+    and rebuilt every leaderboard_refresh_seconds to pick up writes from
+    other workers and new cohort members.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._boards: dict[tuple[int | None, str, str], TopK] = {}
+        self._cohorts: dict[int, tuple[int, ...]] = {}
+        self._week = week_start()
+        self._built = False
+        self._refresher: threading.Thread | None = None
+
+    def _board(self, cohort_id: int | None, level: str, metric: str) -> TopK:
+        key = (cohort_id, level, metric)
+        board = self._boards.get(key)
+        if board is None:
+            board = self._boards[key] = TopK()
+        return board
+
+    def _roll_week(self) -> None:
+        current = week_start()
+        if current != self._week:
+            # 주간 리셋: 지난주 리뷰 수는 0
+            self._boards = {k: v for k, v in self._boards.items() if k[2] != "week_reviews"}
+            self._week = current
+
+    def _apply(self, score: Score) -> None:
+        week_reviews = score.week_reviews if score.week_start == self._week else 0
+        for cohort_id in (None, *self._cohorts.get(score.user_id, ())):
+            self._board(cohort_id, score.difficulty_level, "mastered").set(score.user_id, score.mastered)
+            if week_reviews:
+                self._board(cohort_id, score.difficulty_level, "week_reviews").set(score.user_id, week_reviews)
+
+    def rebuild(self) -> None:
+        with ReadSessionLocal() as db:
+            members = db.execute(select(CohortMember.user_id, CohortMember.cohort_id)).all()
+        cohorts: dict[int, list[int]] = {}
+        for user_id, cohort_id in members:
+            cohorts.setdefault(user_id, []).append(cohort_id)
+
+        scores: list[Score] = []
+        for db in shard_sessions(read_only=True):
+            scores += [
+                Score(*row)
+                for row in db.execute(
+                    select(
+                        UserScore.user_id,
+                        UserScore.difficulty_level,
+                        UserScore.mastered_count,
+                        UserScore.week_start,
+                        UserScore.week_reviews,
+                    )
+                )
+            ]
+
+        with self._lock:
+            self._boards = {}
+            self._cohorts = {user_id: tuple(ids) for user_id, ids in cohorts.items()}
+            self._week = week_start()
+            for score in scores:
+                self._apply(score)
+            self._built = True
+
+    def apply(self, scores: list[Score]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            self._roll_week()
+            for score in scores:
+                self._apply(score)
+
+    def add_members(self, cohort_id: int, user_ids: list[int]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            for user_id in user_ids:
+                cohorts = self._cohorts.get(user_id, ())
+                if cohort_id in cohorts:
+                    continue
+                self._cohorts[user_id] = (*cohorts, cohort_id)
+                # 전체 보드에 있는 현재 점수를 새 코호트 보드로 복사
+                for (board_cohort, level, metric), board in list(self._boards.items()):
+                    if board_cohort is None and user_id in board.scores:
+                        self._board(cohort_id, level, metric).set(user_id, board.scores[user_id])
+
+    def enroll_after_commit(self, session: Session, cohort_id: int, user_ids: list[int]) -> None:
+        session.info.setdefault(_PENDING_MEMBERS_KEY, []).append((cohort_id, list(user_ids)))
+
+    def top(
+        self, *, difficulty_level: str, metric: str, cohort_id: int | None = None, limit: int = 10
+    ) -> tuple[date, list[tuple[int, int]]]:
+        if not self._built:
+            self.rebuild()
+        with self._lock:
+            self._roll_week()
+            board = self._boards.get((cohort_id, difficulty_level, metric))
+            return self._week, board.best(limit) if board else []
+
+    def start(self) -> None:
+        """Build at startup and keep refreshing in a daemon thread."""
+        try:
+            self.rebuild()
+        except SQLAlchemyError:
+            # 테이블이 아직 없으면 첫 조회 때 만든다
+            logger.warning("leaderboard rebuild failed at startup", exc_info=True)
+
+        if settings.leaderboard_refresh_seconds > 0 and self._refresher is None:
+            self._refresher = threading.Thread(target=self._refresh_loop, name="leaderboard-refresh", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            time.sleep(settings.leaderboard_refresh_seconds)
+            try:
+                self.rebuild()
+            except SQLAlchemyError:
+                logger.warning("leaderboard refresh failed", exc_info=True)
+
+
+leaderboards = Leaderboards()
+
+
+def record_review(db: Session, *, user_id: int, difficulty_level: str, mastered_delta: int, now: datetime) -> None:
+    """Bump the user's counters in the review transaction; boards update after commit.
+
+    `now` is the review's own time (client-supplied for /sync). A review from
+    a week older than the stored week_start is not counted weekly, and
+    week_start never moves backwards.
+    """
+    # 시계가 빠른 클라이언트가 미래 주를 만들지 않도록 서버 기준 주로 자른다
+    week = min(week_start(now.date()), week_start())
+    stmt = dialect_insert(db, UserScore).values(
+        user_id=user_id,
+        difficulty_level=difficulty_level,
+        mastered_count=max(0, mastered_delta),
+        week_start=week,
+        week_reviews=1,
+        updated_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserScore.user_id, UserScore.difficulty_level],
+        set_={
+            "mastered_count": UserScore.mastered_count + mastered_delta,
+            # 새 주면 1 부터, 같은 주면 +1, 지난주 리뷰(오프라인 동기화)는 그대로
+            "week_reviews": case(
+                (UserScore.week_start < week, 1),
+                (UserScore.week_start == week, UserScore.week_reviews + 1),
+                else_=UserScore.week_reviews,
+            ),
+            "week_start": case((UserScore.week_start < week, week), else_=UserScore.week_start),
+            "updated_at": now,
+        },
+    ).returning(
+        UserScore.user_id,
+        UserScore.difficulty_level,
+        UserScore.mastered_count,
+        UserScore.week_start,
+        UserScore.week_reviews,
+    )
+    score = Score(*db.execute(stmt).one())
+    db.info.setdefault(_PENDING_KEY, {})[(user_id, difficulty_level)] = score
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        leaderboards.apply(list(pending.values()))
+    for cohort_id, user_ids in session.info.pop(_PENDING_MEMBERS_KEY, ()):
+        leaderboards.add_members(cohort_id, user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_PENDING_MEMBERS_KEY, None)
@@ -1,19 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .admission import AdmissionMiddleware
+from .leaderboard import leaderboards
 from .settings import settings
+from .routers.admin import admin_router
 from .routers.api import api_router
+from .routers.study import study_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 리더보드 top-K 는 워커 메모리에 있으므로 시작할 때 카운터에서 다시 만든다
+    leaderboards.start()
+    yield
 
 
 def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.app_name,
+        lifespan=lifespan,
         root_path=settings.base_path,
         openapi_url="/api/openapi.json",
         docs_url="/api/docs",
         redoc_url="/api/redoc",
     )
 
+    # CORS 보다 안쪽에 두어 429 응답에도 CORS 헤더가 붙도록 한다
+    app.add_middleware(AdmissionMiddleware)
+
     allow_origins = [o.strip() for o in settings.cors_allow_origins.split(",") if o.strip()]
 
     app.add_middleware(
@@ -25,6 +42,8 @@ def create_app() -> FastAPI:
     )
 
     app.include_router(api_router, prefix="/api")
+    app.include_router(admin_router, prefix="/api/admin")
+    app.include_router(study_router, prefix="/api")
 
     return app
 
@@ -1,6 +1,18 @@
 from datetime import date, datetime
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -74,12 +86,28 @@ class UserProgress(Base):
     correct_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     wrong_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
+    # app.schedulers 상태 (SM-2: interval/ease, FSRS: stability/difficulty). 0 = 아직 없음
+    interval_days: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    ease_factor: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    stability: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    difficulty: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # POST /sync 용 사용자별 변경 순번 (app.sync 가 flush 시점에 채운다)
+    change_seq: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
     user: Mapped["User"] = relationship(back_populates="progress")
     vocab: Mapped["Vocab"] = relationship(back_populates="progress")
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "vocab_id", "cycle_no", name="uq_user_progress_user_vocab_cycle"),
+        Index("ix_user_progress_user_change_seq", "user_id", "change_seq"),
+        # /reviews/forecast 집계용 covering index (테이블을 읽지 않는다)
+        Index("ix_user_progress_forecast", "user_id", "is_mastered", "next_review_date", "cycle_no", "vocab_id"),
+    )
+
 
 class LevelCycle(Base):
     __tablename__ = "level_cycles"
@@ -96,6 +124,10 @@ class LevelCycle(Base):
     started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "difficulty_level", "cycle_no", name="uq_level_cycles_user_level_cycle"),
+    )
+
 
 class LevelDayProgress(Base):
     __tablename__ = "level_day_progress"
@@ -111,3 +143,127 @@ class LevelDayProgress(Base):
     status: Mapped[str] = mapped_column(String(20), default="locked", nullable=False)
     opened_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    change_seq: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "difficulty_level", "cycle_no", "day", name="uq_level_day_progress_user_level_cycle_day"
+        ),
+        Index("ix_level_day_progress_user_change_seq", "user_id", "change_seq"),
+    )
+
+
+class VocabDistractor(Base):
+    __tablename__ = "vocab_distractors"
+
+    # migrate_vocab_csv.py 실행 시 app.distractors.rebuild_distractors 로 미리 계산된다.
+    vocab_id: Mapped[int] = mapped_column(ForeignKey("vocab.id"), primary_key=True)
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    distractor_id: Mapped[int] = mapped_column(ForeignKey("vocab.id"), nullable=False)
+
+
+class UserSyncState(Base):
+    __tablename__ = "user_sync_state"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    # 마지막으로 발급한 change_seq (단조 증가)
+    last_seq: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class UserScore(Base):
+    __tablename__ = "user_scores"
+
+    # 리더보드 카운터 (app.leaderboard). submit_review 가 증분 갱신한다
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    difficulty_level: Mapped[str] = mapped_column(String(20), primary_key=True)
+
+    # 현재 외운 단어 수 (사이클 누적)
+    mastered_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # week_start(월요일) 주의 리뷰 수. 다른 주의 값이면 0 으로 본다
+    week_start: Mapped[date] = mapped_column(Date, nullable=False)
+    week_reviews: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class SyncReceipt(Base):
+    __tablename__ = "sync_receipts"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    idempotency_key: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    vocab_id: Mapped[int] = mapped_column(ForeignKey("vocab.id"), nullable=False)
+    result: Mapped[str] = mapped_column(String(20), nullable=False)
+    reviewed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # False 면 더 최근 리뷰가 이미 반영되어 있어 로그만 남긴 경우
+    applied: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (UniqueConstraint("user_id", "idempotency_key", name="uq_sync_receipts_user_key"),)
+
+
+class CacheInvalidation(Base):
+    __tablename__ = "cache_invalidations"
+
+    # app.cache.TableTransport: 워커들이 id 순으로 폴링하는 무효화 로그
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    key: Mapped[str] = mapped_column(String(200), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True, nullable=False)
+
+
+class UserProgressArchive(Base):
+    __tablename__ = "user_progress_archive"
+
+    # completed_confirmed 사이클의 user_progress 행을 (user, level, cycle) 단위로 압축 보관 (app.archive)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    difficulty_level: Mapped[str] = mapped_column(String(20), nullable=False)
+    cycle_no: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    row_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mastered_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # zlib(JSON {"columns": [...], "rows": [[...], ...]})
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "difficulty_level", "cycle_no", name="uq_user_progress_archive_user_level_cycle"),
+    )
+
+
+class SchedulerParams(Base):
+    __tablename__ = "scheduler_params"
+
+    # fit_scheduler_params.py 결과. user_id/difficulty_level 이 NULL 이면 해당 범위 전체의 기본값
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    scheduler: Mapped[str] = mapped_column(String(20), nullable=False)
+    user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    difficulty_level: Mapped[str | None] = mapped_column(String(20), nullable=True)
+
+    # JSON {"interval_scale": ...}
+    params: Mapped[str] = mapped_column(Text, nullable=False)
+    review_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # 보정 후 예측 회상률 vs 실제 회상률 RMSE (구간별)
+    rmse: Mapped[float | None] = mapped_column(Float, nullable=True)
+    fitted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (Index("ix_scheduler_params_scheduler_user", "scheduler", "user_id"),)
+
+
+class Cohort(Base):
+    __tablename__ = "cohorts"
+
+    # 반(class) 단위 일괄 등록 (app.provisioning)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CohortMember(Base):
+    __tablename__ = "cohort_members"
+
+    cohort_id: Mapped[int] = mapped_column(ForeignKey("cohorts.id"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True, index=True)
+    joined_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from .models import Vocab
+
+PACKS_SUBDIR = "packs"
+MANIFEST_NAME = "manifest.json"
+AUDIO_SUBDIR = "audio"
+AUDIO_EXTENSIONS = (".mp3", ".m4a", ".ogg", ".wav")
+
+_manifest_cache: tuple[float, dict] | None = None
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _audio_assets(uploads_dir: Path) -> dict[int, list[dict]]:
+    # uploads/audio/<vocab_id>.mp3 형태의 파일을 vocab_id 별로 묶는다.
+    assets: dict[int, list[dict]] = defaultdict(list)
+    audio_dir = uploads_dir / AUDIO_SUBDIR
+    if not audio_dir.is_dir():
+        return assets
+
+    for path in sorted(audio_dir.iterdir()):
+        if path.suffix.lower() not in AUDIO_EXTENSIONS or not path.stem.isdigit():
+            continue
+        assets[int(path.stem)].append(
+            {
+                "path": path.relative_to(uploads_dir).as_posix(),
+                "size": path.stat().st_size,
+                "sha256": _sha256_file(path),
+            }
+        )
+    return assets
+
+
+def build_packs(conn: Connection, uploads_dir: Path, *, prune: bool = False) -> dict:
+    """Write one gzip pack per (difficulty_level, day) and the manifest listing them.
+
+    Pack file names embed the content hash, so an unchanged day keeps its URL and
+    a changed day gets a new one; nginx can then serve them as immutable. The
+    manifest's sha256 and size describe the .json.gz bytes as downloaded.
+    """
+    rows = conn.execute(
+        select(
+            Vocab.id,
+            Vocab.difficulty_level,
+            Vocab.day,
+            Vocab.topic,
+            Vocab.word,
+            Vocab.meaning,
+            Vocab.example_en,
+            Vocab.example_kr,
+        )
+        .where(Vocab.difficulty_level.is_not(None), Vocab.day.is_not(None))
+        .order_by(Vocab.difficulty_level.asc(), Vocab.day.asc(), Vocab.id.asc())
+    ).all()
+
+    groups: dict[tuple[str, int], list] = defaultdict(list)
+    for row in rows:
+        groups[(row.difficulty_level, row.day)].append(row)
+
+    audio = _audio_assets(uploads_dir)
+    packs_dir = uploads_dir / PACKS_SUBDIR
+
+    entries = []
+    for (level, day), group in sorted(groups.items()):
+        vocab = [
+            {
+                "id": r.id,
+                "difficulty_level": r.difficulty_level,
+                "day": r.day,
+                "topic": r.topic,
+                "word": r.word,
+                "meaning": r.meaning,
+                "example_en": r.example_en,
+                "example_kr": r.example_kr,
+            }
+            for r in group
+        ]
+        assets = [{"vocab_id": r.id, **asset} for r in group for asset in audio.get(r.id, [])]
+        body = json.dumps(
+            {"difficulty_level": level, "day": day, "vocab": vocab, "audio": assets},
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+        # mtime=0 -> 같은 내용이면 같은 바이트. 해시는 nginx 가 내려주는 .json.gz 바이트 기준
+        packed = gzip.compress(body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(packed).hexdigest()
+        rel_path = f"{PACKS_SUBDIR}/{level}/day-{day:02d}.{digest[:16]}.json.gz"
+        path = uploads_dir / rel_path
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(packed)
+            tmp.replace(path)
+
+        entries.append(
+            {
+                "difficulty_level": level,
+                "day": day,
+                "path": rel_path,
+                "sha256": digest,
+                "size": len(packed),
+                "word_count": len(vocab),
+                "audio_count": len(assets),
+            }
+        )
+
+    manifest = {"generated_at": datetime.utcnow().isoformat(), "packs": entries}
+    packs_dir.mkdir(parents=True, exist_ok=True)
+    tmp = packs_dir / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(packs_dir / MANIFEST_NAME)
+
+    if prune:
+        keep = {uploads_dir / e["path"] for e in entries}
+        for stale in packs_dir.glob("*/day-*.json.gz"):
+            if stale not in keep:
+                stale.unlink()
+
+    return manifest
+
+
+def load_manifest(uploads_dir: Path) -> dict | None:
+    global _manifest_cache
+
+    path = uploads_dir / PACKS_SUBDIR / MANIFEST_NAME
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    if _manifest_cache is None or _manifest_cache[0] != mtime:
+        _manifest_cache = (mtime, json.loads(path.read_text(encoding="utf-8")))
+    return _manifest_cache[1]
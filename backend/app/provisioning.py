@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import get_args
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal, dialect_insert, shard_for_user
+from .leaderboard import leaderboards
+from .models import Cohort, CohortMember, LevelCycle, LevelDayProgress, User, UserSyncState
+from .schemas import LevelValue
+from .settings import settings
+
+LEVELS = get_args(LevelValue)
+DAYS_PER_CYCLE = 30
+# 한 문장에 넣는 행 수 (SQLite 바인드 변수 제한 안쪽)
+BATCH_SIZE = 500
+
+
+@dataclass
+class ProvisionResult:
+    user_ids: list[int] = field(default_factory=list)
+    created: int = 0
+    existing: int = 0
+    cohort_id: int | None = None
+    enrolled: int = 0
+    cycles_created: int = 0
+    days_created: int = 0
+
+
+def _chunks(items: Sequence, size: int = BATCH_SIZE) -> Iterator[Sequence]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def create_users(db: Session, users: Sequence[tuple[str, str]]) -> tuple[list[int], int]:
+    """Insert (username, password_hash) pairs that don't exist yet. Returns (ids in input order, created)."""
+    now = datetime.utcnow()
+    ids: dict[str, int] = {}
+    created = 0
+    for chunk in _chunks(users):
+        stmt = dialect_insert(db, User).values(
+            [{"username": username, "password_hash": password_hash, "created_at": now} for username, password_hash in chunk]
+        )
+        stmt = stmt.on_conflict_do_nothing(index_elements=[User.username]).returning(User.id)
+        created += len(db.execute(stmt).all())
+        names = [username for username, _ in chunk]
+        ids.update(db.execute(select(User.username, User.id).where(User.username.in_(names))).tuples().all())
+    return [ids[username] for username, _ in users], created
+
+
+def enroll(db: Session, cohort_name: str, user_ids: Sequence[int]) -> tuple[int, int]:
+    """Get-or-create the cohort and add the users. Returns (cohort_id, newly enrolled)."""
+    now = datetime.utcnow()
+    stmt = dialect_insert(db, Cohort).values(name=cohort_name, created_at=now)
+    stmt = stmt.on_conflict_do_update(index_elements=[Cohort.name], set_={"name": stmt.excluded.name})
+    cohort_id = int(db.execute(stmt.returning(Cohort.id)).scalar_one())
+
+    enrolled = 0
+    for chunk in _chunks(user_ids):
+        stmt = dialect_insert(db, CohortMember).values(
+            [{"cohort_id": cohort_id, "user_id": user_id, "joined_at": now} for user_id in chunk]
+        )
+        stmt = stmt.on_conflict_do_nothing(index_elements=[CohortMember.cohort_id, CohortMember.user_id])
+        enrolled += len(db.execute(stmt.returning(CohortMember.user_id)).all())
+    leaderboards.enroll_after_commit(db, cohort_id, user_ids)
+    return cohort_id, enrolled
+
+
+def _materialize(db: Session, user_ids: Sequence[int]) -> tuple[int, int]:
+    now = datetime.utcnow()
+    stmt = dialect_insert(db, LevelCycle).values(
+        [
+            {"user_id": user_id, "difficulty_level": level, "cycle_no": 1, "status": "active", "started_at": now}
+            for user_id in user_ids
+            for level in LEVELS
+        ]
+    )
+    stmt = stmt.on_conflict_do_nothing(
+        index_elements=[LevelCycle.user_id, LevelCycle.difficulty_level, LevelCycle.cycle_no]
+    ).returning(LevelCycle.user_id, LevelCycle.difficulty_level)
+    # 이미 레벨 상태가 있는 사용자는 건드리지 않는다 (요청 경로와 같은 규칙)
+    cycles = db.execute(stmt).all()
+    if not cycles:
+        return 0, 0
+
+    # 사용자별 change_seq 하나 (app.sync.next_change_seq 의 일괄 버전)
+    seq_stmt = dialect_insert(db, UserSyncState).values(
+        [{"user_id": user_id, "last_seq": 1} for user_id in sorted({c.user_id for c in cycles})]
+    )
+    seq_stmt = seq_stmt.on_conflict_do_update(
+        index_elements=[UserSyncState.user_id],
+        set_={"last_seq": UserSyncState.last_seq + 1},
+    ).returning(UserSyncState.user_id, UserSyncState.last_seq)
+    seqs = dict(db.execute(seq_stmt).tuples().all())
+
+    day_stmt = dialect_insert(db, LevelDayProgress).on_conflict_do_nothing(
+        index_elements=[
+            LevelDayProgress.user_id,
+            LevelDayProgress.difficulty_level,
+            LevelDayProgress.cycle_no,
+            LevelDayProgress.day,
+        ]
+    )
+    days = [
+        {
+            "user_id": c.user_id,
+            "difficulty_level": c.difficulty_level,
+            "cycle_no": 1,
+            "day": d,
+            "status": "locked",
+            "change_seq": seqs[c.user_id],
+        }
+        for c in cycles
+        for d in range(1, DAYS_PER_CYCLE + 1)
+    ]
+    # executemany: SQLAlchemy 가 바인드 변수 제한에 맞춰 multi-VALUES 로 묶는다
+    db.execute(day_stmt, days)
+    return len(cycles), len(days)
+
+
+def materialize_initial_state(user_ids: Sequence[int]) -> tuple[int, int]:
+    """Pre-create cycle 1 and its day rows for every level, grouped per shard, one transaction per batch.
+
+    Returns (cycles created, day rows created). Safe to re-run.
+    """
+    by_shard: dict[int | None, list[int]] = defaultdict(list)
+    for user_id in user_ids:
+        by_shard[shard_for_user(user_id) if settings.shard_count else None].append(user_id)
+
+    cycles = days = 0
+    for shard, shard_user_ids in by_shard.items():
+        with SessionLocal() as db:
+            if shard is not None:
+                db.info["shard"] = shard
+            # 배치마다 커밋해서 쓰기 잠금을 오래 잡지 않는다
+            for chunk in _chunks(shard_user_ids, BATCH_SIZE // len(LEVELS)):
+                c, d = _materialize(db, chunk)
+                db.commit()
+                cycles += c
+                days += d
+    return cycles, days
+
+
+def provision(
+    db: Session, users: Sequence[tuple[str, str]], *, cohort: str | None = None, materialize: bool = True
+) -> ProvisionResult:
+    """Create users, enroll them in `cohort`, commit, then pre-create their level state."""
+    # 같은 요청 안의 중복 username 은 처음 것만
+    first: dict[str, str] = {}
+    for username, password_hash in users:
+        first.setdefault(username, password_hash)
+    unique = list(first.items())
+    user_ids, created = create_users(db, unique)
+    result = ProvisionResult(user_ids=user_ids, created=created, existing=len(unique) - created)
+    if cohort:
+        result.cohort_id, result.enrolled = enroll(db, cohort, user_ids)
+    # level 상태는 다른 세션(shard)에서 만드므로 사용자 행을 먼저 커밋한다
+    db.commit()
+
+    if materialize:
+        result.cycles_created, result.days_created = materialize_initial_state(user_ids)
+    return result
@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from .cache import cache
+from .db import dialect_insert, use_user_shard
+from .forecast import record_move
+from .leaderboard import record_review
+from .models import LevelCycle, LevelDayProgress, SchedulerParams, StudyLog, User, UserProgress, Vocab
+from .schedulers import CardState, get_scheduler
+from .schemas import CardOut, VocabOut
+from .settings import settings
+from .sync import next_change_seq
+
+
+def upsert_cycle(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> LevelCycle:
+    # 동시 요청이 같은 사이클을 만들어도 unique 제약 + ON CONFLICT 로 한 행만 남는다
+    stmt = dialect_insert(db, LevelCycle).values(
+        user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle_no, status="active"
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LevelCycle.user_id, LevelCycle.difficulty_level, LevelCycle.cycle_no],
+        set_={"cycle_no": stmt.excluded.cycle_no},
+    ).returning(LevelCycle)
+    return db.scalars(stmt).one()
+
+
+def get_or_create_active_cycle(db: Session, *, user_id: int, difficulty_level: str) -> LevelCycle:
+    cycle = db.execute(
+        select(LevelCycle)
+        .where(
+            and_(
+                LevelCycle.user_id == user_id,
+                LevelCycle.difficulty_level == difficulty_level,
+                LevelCycle.status.in_(["active", "completed_pending_confirm"]),
+            )
+        )
+        .order_by(LevelCycle.cycle_no.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+    if cycle is None:
+        cycle = upsert_cycle(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=1)
+
+    return cycle
+
+
+def ensure_day_rows(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> None:
+    # 미리 만들어 둔 사용자(provision_users.py)는 읽기만 하고 끝난다 (쓰기 잠금 없음)
+    existing = db.execute(
+        select(func.count())
+        .select_from(LevelDayProgress)
+        .where(
+            and_(
+                LevelDayProgress.user_id == user_id,
+                LevelDayProgress.difficulty_level == difficulty_level,
+                LevelDayProgress.cycle_no == cycle_no,
+            )
+        )
+    ).scalar_one()
+    if existing >= 30:
+        return
+
+    stmt = dialect_insert(db, LevelDayProgress).values(
+        [
+            {
+                "user_id": user_id,
+                "difficulty_level": difficulty_level,
+                "cycle_no": cycle_no,
+                "day": d,
+                "status": "locked",
+            }
+            for d in range(1, 31)
+        ]
+    )
+    stmt = stmt.on_conflict_do_nothing(
+        index_elements=[
+            LevelDayProgress.user_id,
+            LevelDayProgress.difficulty_level,
+            LevelDayProgress.cycle_no,
+            LevelDayProgress.day,
+        ]
+    ).returning(LevelDayProgress.id)
+    created = db.execute(stmt).scalars().all()
+
+    # Core insert 는 before_flush 를 거치지 않으므로 새로 만든 행에만 직접 순번을 찍는다
+    if created:
+        db.execute(
+            update(LevelDayProgress)
+            .where(LevelDayProgress.id.in_(created))
+            .values(change_seq=next_change_seq(db, user_id))
+        )
+
+
+def get_open_day(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> LevelDayProgress | None:
+    return db.execute(
+        select(LevelDayProgress)
+        .where(
+            and_(
+                LevelDayProgress.user_id == user_id,
+                LevelDayProgress.difficulty_level == difficulty_level,
+                LevelDayProgress.cycle_no == cycle_no,
+                LevelDayProgress.status == "open",
+            )
+        )
+        .order_by(LevelDayProgress.day.asc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def get_next_day(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> LevelDayProgress | None:
+    return db.execute(
+        select(LevelDayProgress)
+        .where(
+            and_(
+                LevelDayProgress.user_id == user_id,
+                LevelDayProgress.difficulty_level == difficulty_level,
+                LevelDayProgress.cycle_no == cycle_no,
+                LevelDayProgress.status == "locked",
+            )
+        )
+        .order_by(LevelDayProgress.day.asc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+class CycleSnapshot(NamedTuple):
+    cycle_no: int
+    status: str
+
+
+def level_key(user_id: int, difficulty_level: str) -> str:
+    return f"user:{user_id}:level:{difficulty_level}"
+
+
+def require_user(db: Session, user_id: int) -> None:
+    # 핸들러의 첫 DB 접근: 여기서 사용자 shard 를 고정한다
+    use_user_shard(db, user_id)
+
+    def load() -> bool | None:
+        # 없는 사용자는 캐시하지 않는다 (None)
+        return True if db.get(User, user_id) is not None else None
+
+    if not cache.get(f"user:{user_id}", load):
+        raise HTTPException(status_code=404, detail="user not found")
+
+
+def active_cycle(db: Session, *, user_id: int, difficulty_level: str) -> CycleSnapshot:
+    def load() -> CycleSnapshot:
+        cycle = get_or_create_active_cycle(db, user_id=user_id, difficulty_level=difficulty_level)
+        ensure_day_rows(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle.cycle_no)
+        return CycleSnapshot(cycle_no=cycle.cycle_no, status=cycle.status)
+
+    return cache.get(f"{level_key(user_id, difficulty_level)}:cycle", load)
+
+
+def read_cycle(db: Session, *, user_id: int, difficulty_level: str) -> CycleSnapshot:
+    """Read-only variant of active_cycle for GET handlers.
+
+    A user who has never written anything for the level gets a virtual first
+    cycle; the real rows are created on the first open_day / review.
+    """
+
+    def load() -> CycleSnapshot | None:
+        cycle = db.execute(
+            select(LevelCycle.cycle_no, LevelCycle.status)
+            .where(
+                and_(
+                    LevelCycle.user_id == user_id,
+                    LevelCycle.difficulty_level == difficulty_level,
+                    LevelCycle.status.in_(["active", "completed_pending_confirm"]),
+                )
+            )
+            .order_by(LevelCycle.cycle_no.desc())
+            .limit(1)
+        ).first()
+        # 가상 사이클은 캐시하지 않는다 (None)
+        return CycleSnapshot(cycle_no=cycle.cycle_no, status=cycle.status) if cycle else None
+
+    snapshot = cache.get(f"{level_key(user_id, difficulty_level)}:cycle", load)
+    return snapshot or CycleSnapshot(cycle_no=1, status="active")
+
+
+def open_day_no(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> int | None:
+    def load() -> int:
+        row = get_open_day(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle_no)
+        return row.day if row else 0
+
+    return cache.get(f"{level_key(user_id, difficulty_level)}:open_day:{cycle_no}", load) or None
+
+
+class CardRow(NamedTuple):
+    """Only the columns CardOut needs, selected as Core rows (no ORM entities / identity map)."""
+
+    id: int
+    difficulty_level: str | None
+    day: int | None
+    topic: str | None
+    word: str
+    meaning: str
+    example_en: str | None
+    example_kr: str | None
+    # 새 카드(진행 기록 없음)는 None
+    leitner_level: int | None = None
+    next_review_date: date | None = None
+    is_mastered: bool | None = None
+
+
+VOCAB_CARD_COLUMNS = (
+    Vocab.id,
+    Vocab.difficulty_level,
+    Vocab.day,
+    Vocab.topic,
+    Vocab.word,
+    Vocab.meaning,
+    Vocab.example_en,
+    Vocab.example_kr,
+)
+PROGRESS_CARD_COLUMNS = (UserProgress.leitner_level, UserProgress.next_review_date, UserProgress.is_mastered)
+
+
+def card_row(db: Session, stmt) -> CardRow | None:
+    row = db.execute(stmt).first()
+    return CardRow(*row) if row is not None else None
+
+
+def card_out(card: CardRow) -> CardOut:
+    return CardOut(
+        vocab=VocabOut.model_validate(card),
+        leitner_level=card.leitner_level,
+        next_review_date=card.next_review_date,
+        is_mastered=card.is_mastered,
+    )
+
+
+def select_today_card(
+    db: Session, *, user_id: int, difficulty_level: str, cycle_no: int, day: int
+) -> CardRow | None:
+    today = date.today()
+
+    # 1) due reviews in this level+day+cycle
+    due_stmt = (
+        select(*VOCAB_CARD_COLUMNS, *PROGRESS_CARD_COLUMNS)
+        .select_from(UserProgress)
+        .join(Vocab, UserProgress.vocab_id == Vocab.id)
+        .where(
+            and_(
+                UserProgress.user_id == user_id,
+                UserProgress.cycle_no == cycle_no,
+                UserProgress.is_mastered.is_(False),
+                UserProgress.next_review_date.is_not(None),
+                UserProgress.next_review_date <= today,
+                Vocab.difficulty_level == difficulty_level,
+                Vocab.day == day,
+            )
+        )
+        .order_by(UserProgress.next_review_date.asc(), UserProgress.id.asc())
+        .limit(1)
+    )
+    due = card_row(db, due_stmt)
+    if due is not None:
+        return due
+
+    # 2) new cards for this level+day (exclude progress for current cycle)
+    vocab_stmt = (
+        select(*VOCAB_CARD_COLUMNS)
+        .where(and_(Vocab.difficulty_level == difficulty_level, Vocab.day == day))
+        .where(
+            ~Vocab.id.in_(
+                select(UserProgress.vocab_id).where(
+                    and_(UserProgress.user_id == user_id, UserProgress.cycle_no == cycle_no)
+                )
+            )
+        )
+        .order_by(Vocab.id.asc())
+        .limit(1)
+    )
+    return card_row(db, vocab_stmt)
+
+
+def scheduler_params(db: Session, *, user_id: int, difficulty_level: str | None) -> dict[str, float]:
+    """Fitted parameters for the configured scheduler, most specific scope first."""
+    scheduler = get_scheduler(settings.scheduler)
+
+    def load() -> dict[str, float]:
+        rows = db.execute(
+            select(SchedulerParams.user_id, SchedulerParams.difficulty_level, SchedulerParams.params).where(
+                and_(
+                    SchedulerParams.scheduler == scheduler.name,
+                    or_(SchedulerParams.user_id == user_id, SchedulerParams.user_id.is_(None)),
+                    or_(SchedulerParams.difficulty_level == difficulty_level, SchedulerParams.difficulty_level.is_(None)),
+                )
+            )
+        ).all()
+        # (user, level) > (user) > (level) > 전체
+        best = max(rows, key=lambda r: (r.user_id is not None, r.difficulty_level is not None), default=None)
+        return scheduler.params(json.loads(best.params) if best else None)
+
+    return cache.get(f"scheduler:{scheduler.name}:user:{user_id}:level:{difficulty_level}", load)
+
+
+def apply_review(
+    db: Session,
+    *,
+    user_id: int,
+    vocab: Vocab,
+    grade: str,
+    now: datetime,
+    today: date | None = None,
+    cycle_no: int | None = None,
+) -> UserProgress:
+    today = today or date.today()
+
+    # cycle_no: 호출자가 이미 아는 vocab 레벨의 현재 사이클 (WebSocket 세션)
+    if cycle_no is None:
+        cycle_no = 1
+        if vocab.difficulty_level is not None:
+            cycle_no = active_cycle(db, user_id=user_id, difficulty_level=vocab.difficulty_level).cycle_no
+
+    # get-or-create in one statement; 이미 세션에 있는 객체면 아직 flush 안 된 변경도 유지된다
+    progress_stmt = dialect_insert(db, UserProgress).values(user_id=user_id, vocab_id=vocab.id, cycle_no=cycle_no)
+    progress_stmt = progress_stmt.on_conflict_do_update(
+        index_elements=[UserProgress.user_id, UserProgress.vocab_id, UserProgress.cycle_no],
+        set_={"cycle_no": progress_stmt.excluded.cycle_no},
+    ).returning(UserProgress)
+    progress = db.scalars(progress_stmt).one()
+
+    db.add(
+        StudyLog(
+            user_id=user_id,
+            vocab_id=vocab.id,
+            difficulty_level=vocab.difficulty_level,
+            cycle_no=cycle_no,
+            result=grade,
+            studied_at=now,
+        )
+    )
+
+    # 오프라인 동기화: 이미 반영된 리뷰보다 오래된 리뷰는 기록만 남기고 스케줄은 유지
+    if progress.last_reviewed_at is not None and now < progress.last_reviewed_at:
+        if vocab.difficulty_level is not None:
+            record_review(db, user_id=user_id, difficulty_level=vocab.difficulty_level, mastered_delta=0, now=now)
+        return progress
+
+    was_mastered = bool(progress.is_mastered)
+    old_due = progress.next_review_date
+
+    scheduler = get_scheduler(settings.scheduler)
+    params = scheduler_params(db, user_id=user_id, difficulty_level=vocab.difficulty_level)
+    elapsed_days = None
+    if progress.last_reviewed_at is not None:
+        elapsed_days = (now - progress.last_reviewed_at).total_seconds() / 86400
+    state = CardState(
+        leitner_level=int(progress.leitner_level or 1),
+        interval_days=float(progress.interval_days or 0),
+        ease_factor=float(progress.ease_factor or 0),
+        stability=float(progress.stability or 0),
+        difficulty=float(progress.difficulty or 0),
+        correct_streak=int(progress.correct_streak or 0),
+        wrong_count=int(progress.wrong_count or 0),
+    )
+    scheduled = scheduler.review(state, grade, elapsed_days=elapsed_days, params=params)
+
+    new = scheduled.state
+    progress.leitner_level = new.leitner_level
+    progress.interval_days = new.interval_days
+    progress.ease_factor = new.ease_factor
+    progress.stability = new.stability
+    progress.difficulty = new.difficulty
+    progress.correct_streak = new.correct_streak
+    progress.wrong_count = new.wrong_count
+    progress.next_review_date = today + timedelta(days=scheduled.due_days)
+    progress.last_reviewed_at = now
+    progress.updated_at = now
+    progress.is_mastered = scheduled.is_mastered
+
+    if vocab.difficulty_level is not None:
+        record_review(
+            db,
+            user_id=user_id,
+            difficulty_level=vocab.difficulty_level,
+            mastered_delta=int(progress.is_mastered) - int(was_mastered),
+            now=now,
+        )
+        record_move(
+            db,
+            difficulty_level=vocab.difficulty_level,
+            old_due=old_due,
+            was_mastered=was_mastered,
+            new_due=progress.next_review_date,
+            is_mastered=progress.is_mastered,
+        )
+    return progress
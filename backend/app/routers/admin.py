@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import secrets
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..export import MEDIA_TYPES, export_filename, export_stream
+from ..models import User
+from ..provisioning import ProvisionResult, enroll, materialize_initial_state, provision
+from ..schemas import EnrollIn, ExportFormat, ExportTable, LevelValue, ProvisionIn, ProvisionOut
+from ..settings import settings
+from ..sync import to_utc_naive
+
+
+def _require_admin(x_admin_token: str | None = Header(None)) -> None:
+    # ADMIN_TOKEN 이 비어 있으면 관리자 API 자체를 숨긴다
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="invalid admin token")
+
+
+admin_router = APIRouter(dependencies=[Depends(_require_admin)])
+
+
+def _provision_out(result: ProvisionResult) -> ProvisionOut:
+    return ProvisionOut(
+        cohort_id=result.cohort_id,
+        created=result.created,
+        existing=result.existing,
+        enrolled=result.enrolled,
+        cycles_created=result.cycles_created,
+        days_created=result.days_created,
+        user_ids=result.user_ids,
+    )
+
+
+@admin_router.post("/users/bulk", response_model=ProvisionOut)
+def bulk_create_users(payload: ProvisionIn, db: Session = Depends(get_db)):
+    result = provision(db, [(u.username, u.password_hash) for u in payload.users], cohort=payload.cohort)
+    return _provision_out(result)
+
+
+@admin_router.post("/cohorts/{cohort}/enroll", response_model=ProvisionOut)
+def enroll_users(cohort: str, payload: EnrollIn, db: Session = Depends(get_db)):
+    user_ids = list(dict.fromkeys(payload.user_ids))
+    found = set(db.execute(select(User.id).where(User.id.in_(user_ids))).scalars().all())
+    missing = [user_id for user_id in user_ids if user_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"users not found: {missing[:20]}")
+
+    result = ProvisionResult(user_ids=user_ids, existing=len(user_ids))
+    result.cohort_id, result.enrolled = enroll(db, cohort, user_ids)
+    db.commit()
+    result.cycles_created, result.days_created = materialize_initial_state(user_ids)
+    return _provision_out(result)
+
+
+@admin_router.get("/export/{table}")
+def export_table(
+    table: ExportTable,
+    format: ExportFormat = Query("ndjson"),
+    gzip: bool = Query(False),
+    user_id: int | None = Query(None),
+    difficulty_level: LevelValue | None = Query(None),
+    cycle_no: int | None = Query(None, ge=1),
+    since: datetime | None = Query(None),
+    until: datetime | None = Query(None),
+    include_archived: bool = Query(False),
+):
+    # DB 의 시각은 naive UTC: 'Z'/오프셋이 붙은 값도 스트림 시작 전에 맞춰 둔다
+    since = to_utc_naive(since) if since is not None else None
+    until = to_utc_naive(until) if until is not None else None
+
+    # 요청 세션(get_db)은 응답 전에 닫히므로 스트림이 shard 별 세션을 직접 연다
+    body = export_stream(
+        table,
+        format,
+        gzip=gzip,
+        user_id=user_id,
+        difficulty_level=difficulty_level,
+        cycle_no=cycle_no,
+        since=since,
+        until=until,
+        include_archived=include_archived,
+    )
+    filename = export_filename(table, format, gzip=gzip)
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,112 +1,120 @@
 from __future__ import annotations
 
+import hashlib
+import hmac
+import random
+import secrets
 from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import and_, func, or_, select
-from sqlalchemy.orm import Session
-
-from ..db import get_db
-from ..leitner import LEITNER_MAX_LEVEL, next_review_date_for_level
-from ..models import LevelCycle, LevelDayProgress, StudyLog, User, UserProgress, Vocab
+from sqlalchemy.orm import Session, defer
+
+from ..archive import decode_rows
+from ..cache import cache
+from ..db import get_db, get_read_db
+from ..distractors import QUIZ_DISTRACTORS
+from ..forecast import FORECAST_DAYS, daily_counts, due_counts, system_forecast
+from ..leaderboard import TOP_K, leaderboards
+from ..models import (
+    LevelDayProgress,
+    StudyLog,
+    SyncReceipt,
+    User,
+    UserProgress,
+    UserProgressArchive,
+    Vocab,
+    VocabDistractor,
+)
+from ..packs import load_manifest
+from ..reviews import (
+    PROGRESS_CARD_COLUMNS,
+    VOCAB_CARD_COLUMNS,
+    apply_review,
+    card_out,
+    card_row,
+    ensure_day_rows,
+    get_next_day,
+    get_open_day,
+    get_or_create_active_cycle,
+    level_key,
+    open_day_no,
+    read_cycle,
+    require_user,
+    select_today_card,
+    upsert_cycle,
+)
 from ..schemas import (
+    ArchivedCycleDetailOut,
+    ArchivedCycleOut,
+    ArchivedProgressOut,
     CardOut,
     CompleteDayIn,
     CompleteDayOut,
     ConfirmCycleIn,
     ConfirmCycleOut,
+    ForecastLevelOut,
+    ForecastOut,
+    LeaderboardEntryOut,
+    LeaderboardMetric,
+    LeaderboardOut,
     LevelsStatusOut,
     LevelStatusOut,
+    LevelValue,
     OpenDayIn,
     OpenDayOut,
+    PackOut,
+    PacksOut,
+    ProgressHistoryOut,
+    QuizAnswerIn,
+    QuizAnswerOut,
+    QuizCardOut,
+    QuizChoiceOut,
     ReviewIn,
     ReviewOut,
-    VocabOut,
+    SyncDayOut,
+    SyncIn,
+    SyncOut,
+    SyncProgressOut,
 )
+from ..settings import settings
+from ..sync import current_change_seq, to_utc_naive
 
 api_router = APIRouter()
 
-
-def _get_or_create_active_cycle(db: Session, *, user_id: int, difficulty_level: str) -> LevelCycle:
-    cycle = db.execute(
-        select(LevelCycle)
-        .where(
-            and_(
-                LevelCycle.user_id == user_id,
-                LevelCycle.difficulty_level == difficulty_level,
-                LevelCycle.status.in_(["active", "completed_pending_confirm"]),
-            )
-        )
-        .order_by(LevelCycle.cycle_no.desc())
-        .limit(1)
-    ).scalar_one_or_none()
-
-    if cycle is None:
-        cycle = LevelCycle(user_id=user_id, difficulty_level=difficulty_level, cycle_no=1, status="active")
-        db.add(cycle)
-        db.flush()
-
-    return cycle
+_QUIZ_TOKEN_KEY = settings.quiz_token_secret.encode() or secrets.token_bytes(32)
 
 
-def _ensure_day_rows(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> None:
-    existing = db.execute(
-        select(func.count(LevelDayProgress.id)).where(
-            and_(
-                LevelDayProgress.user_id == user_id,
-                LevelDayProgress.difficulty_level == difficulty_level,
-                LevelDayProgress.cycle_no == cycle_no,
-            )
-        )
-    ).scalar_one()
+class DaySummary(NamedTuple):
+    open_day: int | None
+    next_day: int | None
+    completed_days: int
 
-    if int(existing) >= 30:
-        return
 
-    rows = [
-        LevelDayProgress(
-            user_id=user_id,
-            difficulty_level=difficulty_level,
-            cycle_no=cycle_no,
-            day=d,
-            status="locked",
-        )
-        for d in range(1, 31)
-    ]
-    db.add_all(rows)
-    db.flush()
-
-
-def _get_open_day(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> LevelDayProgress | None:
-    return db.execute(
-        select(LevelDayProgress)
+def _day_summary(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> DaySummary:
+    rows = db.execute(
+        select(LevelDayProgress.status, func.count(LevelDayProgress.id), func.min(LevelDayProgress.day))
         .where(
             and_(
                 LevelDayProgress.user_id == user_id,
                 LevelDayProgress.difficulty_level == difficulty_level,
                 LevelDayProgress.cycle_no == cycle_no,
-                LevelDayProgress.status == "open",
             )
         )
-        .order_by(LevelDayProgress.day.asc())
-        .limit(1)
-    ).scalar_one_or_none()
-
-
-def _get_next_day(db: Session, *, user_id: int, difficulty_level: str, cycle_no: int) -> LevelDayProgress | None:
-    return db.execute(
-        select(LevelDayProgress)
-        .where(
-            and_(
-                LevelDayProgress.user_id == user_id,
-                LevelDayProgress.difficulty_level == difficulty_level,
-                LevelDayProgress.cycle_no == cycle_no,
-                LevelDayProgress.status == "locked",
-            )
-        )
-        .order_by(LevelDayProgress.day.asc())
-        .limit(1)
-    ).scalar_one_or_none()
+        .group_by(LevelDayProgress.status)
+    ).all()
+    if not rows:
+        # day 행이 아직 없으면 1일차부터
+        return DaySummary(open_day=None, next_day=1, completed_days=0)
+
+    by_status = {status: (int(count), first_day) for status, count, first_day in rows}
+    return DaySummary(
+        open_day=by_status.get("open", (0, None))[1],
+        next_day=by_status.get("locked", (0, None))[1],
+        completed_days=by_status.get("completed", (0, None))[0],
+    )
 
 
 @api_router.get("/health")
@@ -114,64 +122,78 @@ def health():
     return {"status": "ok"}
 
 
+@api_router.get("/packs", response_model=PacksOut)
+def list_packs(
+    request: Request,
+    response: Response,
+    difficulty_level: str | None = Query(None),
+):
+    manifest = load_manifest(Path(settings.uploads_dir))
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="content packs not built")
+
+    # pack 파일 자체는 nginx 가 immutable 로 캐시, 목록은 ETag 로 재검증
+    etag = f'"{manifest["generated_at"]}"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    packs = [
+        PackOut(
+            difficulty_level=e["difficulty_level"],
+            day=e["day"],
+            url=f"{settings.uploads_url}/{e['path']}",
+            sha256=e["sha256"],
+            size=e["size"],
+            word_count=e["word_count"],
+            audio_count=e["audio_count"],
+        )
+        for e in manifest["packs"]
+        if difficulty_level is None or e["difficulty_level"] == difficulty_level
+    ]
+    return PacksOut(generated_at=manifest["generated_at"], packs=packs)
+
+
 @api_router.get("/levels/status", response_model=LevelsStatusOut)
-def get_levels_status(user_id: int = Query(...), db: Session = Depends(get_db)):
-    user = db.get(User, user_id)
-    if user is None:
-        raise HTTPException(status_code=404, detail="user not found")
+def get_levels_status(user_id: int = Query(...), db: Session = Depends(get_read_db)):
+    require_user(db, user_id)
 
     levels: list[LevelStatusOut] = []
     for level in ["600", "800", "900"]:
-        cycle = _get_or_create_active_cycle(db, user_id=user_id, difficulty_level=level)
-        _ensure_day_rows(db, user_id=user_id, difficulty_level=level, cycle_no=cycle.cycle_no)
-
-        completed_days = db.execute(
-            select(func.count(LevelDayProgress.id)).where(
-                and_(
-                    LevelDayProgress.user_id == user_id,
-                    LevelDayProgress.difficulty_level == level,
-                    LevelDayProgress.cycle_no == cycle.cycle_no,
-                    LevelDayProgress.status == "completed",
-                )
-            )
-        ).scalar_one()
-
-        open_day = _get_open_day(db, user_id=user_id, difficulty_level=level, cycle_no=cycle.cycle_no)
-        next_day = _get_next_day(db, user_id=user_id, difficulty_level=level, cycle_no=cycle.cycle_no)
+        cycle = read_cycle(db, user_id=user_id, difficulty_level=level)
+        days = _day_summary(db, user_id=user_id, difficulty_level=level, cycle_no=cycle.cycle_no)
 
-        pct = int((int(completed_days) / 30) * 100)
+        pct = int((days.completed_days / 30) * 100)
         levels.append(
             LevelStatusOut(
                 difficulty_level=level,
                 cycle_no=cycle.cycle_no,
                 cycle_status=cycle.status,
-                next_day=next_day.day if next_day else None,
-                open_day=open_day.day if open_day else None,
-                completed_days=int(completed_days),
+                next_day=days.next_day,
+                open_day=days.open_day,
+                completed_days=days.completed_days,
                 cycle_progress_pct=pct,
             )
         )
 
-    db.commit()
     return LevelsStatusOut(user_id=user_id, levels=levels)
 
 
 @api_router.post("/levels/day/open", response_model=OpenDayOut)
 def open_day(payload: OpenDayIn, db: Session = Depends(get_db)):
-    user = db.get(User, payload.user_id)
-    if user is None:
-        raise HTTPException(status_code=404, detail="user not found")
+    require_user(db, payload.user_id)
 
     if payload.day < 1 or payload.day > 30:
         raise HTTPException(status_code=400, detail="day must be 1..30")
 
-    cycle = _get_or_create_active_cycle(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level)
-    _ensure_day_rows(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=cycle.cycle_no)
+    cycle = get_or_create_active_cycle(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level)
+    ensure_day_rows(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=cycle.cycle_no)
 
     if cycle.status != "active":
         raise HTTPException(status_code=400, detail="cycle is not active")
 
-    existing_open = _get_open_day(
+    existing_open = get_open_day(
         db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=cycle.cycle_no
     )
     if existing_open is not None and existing_open.day != payload.day:
@@ -194,7 +216,7 @@ def open_day(payload: OpenDayIn, db: Session = Depends(get_db)):
     if row.status == "completed":
         raise HTTPException(status_code=400, detail="day already completed")
 
-    next_locked = _get_next_day(
+    next_locked = get_next_day(
         db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=cycle.cycle_no
     )
     if next_locked is None or next_locked.day != payload.day:
@@ -203,6 +225,7 @@ def open_day(payload: OpenDayIn, db: Session = Depends(get_db)):
     row.status = "open"
     row.opened_at = datetime.utcnow()
     db.add(row)
+    cache.invalidate_after_commit(db, level_key(payload.user_id, payload.difficulty_level))
     db.commit()
 
     return OpenDayOut(
@@ -218,82 +241,114 @@ def open_day(payload: OpenDayIn, db: Session = Depends(get_db)):
 def get_today_card(
     user_id: int = Query(...),
     difficulty_level: str = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    user = db.get(User, user_id)
-    if user is None:
-        raise HTTPException(status_code=404, detail="user not found")
+    require_user(db, user_id)
 
-    cycle = _get_or_create_active_cycle(db, user_id=user_id, difficulty_level=difficulty_level)
-    _ensure_day_rows(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle.cycle_no)
+    cycle = read_cycle(db, user_id=user_id, difficulty_level=difficulty_level)
 
-    open_day = _get_open_day(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle.cycle_no)
+    open_day = open_day_no(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle.cycle_no)
     if open_day is None:
         raise HTTPException(status_code=400, detail="today learning day is not open")
 
-    today = date.today()
-
-    # 1) due reviews in this level+day+cycle
-    due_stmt = (
-        select(UserProgress, Vocab)
-        .join(Vocab, UserProgress.vocab_id == Vocab.id)
-        .where(
-            and_(
-                UserProgress.user_id == user_id,
-                UserProgress.cycle_no == cycle.cycle_no,
-                UserProgress.is_mastered.is_(False),
-                UserProgress.next_review_date.is_not(None),
-                UserProgress.next_review_date <= today,
-                Vocab.difficulty_level == difficulty_level,
-                Vocab.day == open_day.day,
+    card = select_today_card(
+        db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle.cycle_no, day=open_day
+    )
+    if card is None:
+        raise HTTPException(status_code=404, detail="no cards")
+    return card_out(card)
+
+
+def _quiz_candidates(db: Session, vocab_id: int) -> list[tuple[int, str]]:
+    # precomputed candidates (app.distractors) -> one lookup per card
+    return cache.get(
+        f"vocab:distractors:{vocab_id}",
+        lambda: [
+            tuple(r)
+            for r in db.execute(
+                select(Vocab.id, Vocab.meaning)
+                .join(VocabDistractor, VocabDistractor.distractor_id == Vocab.id)
+                .where(VocabDistractor.vocab_id == vocab_id)
+                .order_by(VocabDistractor.rank.asc())
             )
-        )
-        .order_by(UserProgress.next_review_date.asc(), UserProgress.id.asc())
-        .limit(1)
+        ],
     )
-    due_row = db.execute(due_stmt).first()
-    if due_row:
-        progress, vocab = due_row
-        return CardOut(
-            vocab=VocabOut.model_validate(vocab),
-            leitner_level=progress.leitner_level,
-            next_review_date=progress.next_review_date,
-            is_mastered=progress.is_mastered,
-        )
 
-    # 2) new cards for this level+day (exclude progress for current cycle)
-    vocab_stmt = (
-        select(Vocab)
-        .where(and_(Vocab.difficulty_level == difficulty_level, Vocab.day == open_day.day))
-        .where(
-            ~Vocab.id.in_(
-                select(UserProgress.vocab_id).where(
-                    and_(UserProgress.user_id == user_id, UserProgress.cycle_no == cycle.cycle_no)
-                )
-            )
-        )
-        .order_by(Vocab.id.asc())
-        .limit(1)
+
+def _choice_token(*, user_id: int, vocab_id: int, choice_id: int, nonce: str) -> str:
+    # nonce 는 응답마다 새로 만들어 같은 보기도 매번 다른 토큰이 된다
+    message = f"{user_id}:{vocab_id}:{choice_id}:{nonce}".encode()
+    digest = hmac.new(_QUIZ_TOKEN_KEY, message, hashlib.sha256).hexdigest()[:32]
+    return f"{nonce}.{digest}"
+
+
+def _resolve_choice(token: str, *, user_id: int, vocab_id: int, choice_ids: list[int]) -> int | None:
+    nonce, _, _ = token.partition(".")
+    for choice_id in choice_ids:
+        expected = _choice_token(user_id=user_id, vocab_id=vocab_id, choice_id=choice_id, nonce=nonce)
+        if hmac.compare_digest(token, expected):
+            return choice_id
+    return None
+
+
+@api_router.get("/cards/quiz", response_model=QuizCardOut)
+def get_quiz_card(
+    user_id: int = Query(...),
+    difficulty_level: str = Query(...),
+    db: Session = Depends(get_read_db),
+):
+    require_user(db, user_id)
+
+    cycle = read_cycle(db, user_id=user_id, difficulty_level=difficulty_level)
+
+    open_day = open_day_no(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle.cycle_no)
+    if open_day is None:
+        raise HTTPException(status_code=400, detail="today learning day is not open")
+
+    card = select_today_card(
+        db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle.cycle_no, day=open_day
     )
-    vocab = db.execute(vocab_stmt).scalar_one_or_none()
-    if vocab is None:
+    if card is None:
         raise HTTPException(status_code=404, detail="no cards")
 
-    return CardOut(vocab=VocabOut.model_validate(vocab))
+    candidates = _quiz_candidates(db, card.id)
+    if len(candidates) < QUIZ_DISTRACTORS:
+        raise HTTPException(status_code=404, detail="no quiz distractors")
+
+    nonce = secrets.token_urlsafe(8)
+    options = [(card.id, card.meaning), *random.sample(candidates, QUIZ_DISTRACTORS)]
+    random.shuffle(options)
+    choices = [
+        QuizChoiceOut(
+            choice_id=_choice_token(user_id=user_id, vocab_id=card.id, choice_id=cid, nonce=nonce),
+            meaning=meaning,
+        )
+        for cid, meaning in options
+    ]
+
+    return QuizCardOut(
+        vocab_id=card.id,
+        difficulty_level=card.difficulty_level,
+        day=card.day,
+        topic=card.topic,
+        word=card.word,
+        example_en=card.example_en,
+        choices=choices,
+        leitner_level=card.leitner_level,
+        next_review_date=card.next_review_date,
+        is_mastered=card.is_mastered,
+    )
 
 
 @api_router.get("/cards/remind", response_model=CardOut)
 def get_remind_card(
     user_id: int = Query(...),
     difficulty_level: str = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    user = db.get(User, user_id)
-    if user is None:
-        raise HTTPException(status_code=404, detail="user not found")
+    require_user(db, user_id)
 
-    cycle = _get_or_create_active_cycle(db, user_id=user_id, difficulty_level=difficulty_level)
-    _ensure_day_rows(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle.cycle_no)
+    cycle = read_cycle(db, user_id=user_id, difficulty_level=difficulty_level)
 
     now = datetime.utcnow()
     window_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -316,7 +371,8 @@ def get_remind_card(
     # Prefer non-mastered or wrong_count>0
     today = date.today()
     due_stmt = (
-        select(UserProgress, Vocab)
+        select(*VOCAB_CARD_COLUMNS, *PROGRESS_CARD_COLUMNS)
+        .select_from(UserProgress)
         .join(Vocab, UserProgress.vocab_id == Vocab.id)
         .where(
             and_(
@@ -335,15 +391,9 @@ def get_remind_card(
         .order_by(UserProgress.wrong_count.desc(), UserProgress.next_review_date.asc().nullsfirst())
         .limit(1)
     )
-    row = db.execute(due_stmt).first()
-    if row:
-        progress, vocab = row
-        return CardOut(
-            vocab=VocabOut.model_validate(vocab),
-            leitner_level=progress.leitner_level,
-            next_review_date=progress.next_review_date,
-            is_mastered=progress.is_mastered,
-        )
+    card = card_row(db, due_stmt)
+    if card is not None:
+        return card_out(card)
 
     raise HTTPException(status_code=404, detail="no remind cards")
 
@@ -353,19 +403,15 @@ def get_next_card(
     user_id: int = Query(...),
     difficulty_level: str | None = Query(None),
     day: int | None = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    user = db.get(User, user_id)
-    if user is None:
-        raise HTTPException(status_code=404, detail="user not found")
+    require_user(db, user_id)
 
     today = date.today()
 
     cycle_no = 1
     if difficulty_level is not None:
-        cycle = _get_or_create_active_cycle(db, user_id=user_id, difficulty_level=difficulty_level)
-        _ensure_day_rows(db, user_id=user_id, difficulty_level=difficulty_level, cycle_no=cycle.cycle_no)
-        cycle_no = cycle.cycle_no
+        cycle_no = read_cycle(db, user_id=user_id, difficulty_level=difficulty_level).cycle_no
 
     # 1) Review first (due cards)
     due_filters = [
@@ -381,24 +427,19 @@ def get_next_card(
         due_filters.append(Vocab.day == day)
 
     due_stmt = (
-        select(UserProgress, Vocab)
+        select(*VOCAB_CARD_COLUMNS, *PROGRESS_CARD_COLUMNS)
+        .select_from(UserProgress)
         .join(Vocab, UserProgress.vocab_id == Vocab.id)
         .where(and_(*due_filters))
         .order_by(UserProgress.next_review_date.asc(), UserProgress.id.asc())
         .limit(1)
     )
-    due_row = db.execute(due_stmt).first()
-    if due_row:
-        progress, vocab = due_row
-        return CardOut(
-            vocab=VocabOut.model_validate(vocab),
-            leitner_level=progress.leitner_level,
-            next_review_date=progress.next_review_date,
-            is_mastered=progress.is_mastered,
-        )
+    due = card_row(db, due_stmt)
+    if due is not None:
+        return card_out(due)
 
     # 2) New learning card by filter (difficulty/day)
-    vocab_stmt = select(Vocab)
+    vocab_stmt = select(*VOCAB_CARD_COLUMNS)
     if difficulty_level is not None:
         vocab_stmt = vocab_stmt.where(Vocab.difficulty_level == difficulty_level)
     if day is not None:
@@ -414,114 +455,299 @@ def get_next_card(
     )
 
     vocab_stmt = vocab_stmt.order_by(Vocab.id.asc()).limit(1)
-    vocab = db.execute(vocab_stmt).scalar_one_or_none()
-    if vocab is None:
+    card = card_row(db, vocab_stmt)
+    if card is None:
         raise HTTPException(status_code=404, detail="no cards")
 
-    return CardOut(vocab=VocabOut.model_validate(vocab))
+    return card_out(card)
 
 
 @api_router.post("/review", response_model=ReviewOut)
 def submit_review(payload: ReviewIn, db: Session = Depends(get_db)):
-    user = db.get(User, payload.user_id)
-    if user is None:
-        raise HTTPException(status_code=404, detail="user not found")
+    require_user(db, payload.user_id)
 
     vocab = db.get(Vocab, payload.vocab_id)
     if vocab is None:
         raise HTTPException(status_code=404, detail="vocab not found")
 
-    today = date.today()
     now = datetime.utcnow()
+    progress = apply_review(db, user_id=payload.user_id, vocab=vocab, grade=payload.grade, now=now)
 
-    cycle_no = 1
-    if vocab.difficulty_level is not None:
-        cycle = _get_or_create_active_cycle(db, user_id=payload.user_id, difficulty_level=vocab.difficulty_level)
-        _ensure_day_rows(
-            db, user_id=payload.user_id, difficulty_level=vocab.difficulty_level, cycle_no=cycle.cycle_no
-        )
-        cycle_no = cycle.cycle_no
+    db.commit()
 
-    progress_stmt = select(UserProgress).where(
-        and_(
-            UserProgress.user_id == payload.user_id,
-            UserProgress.vocab_id == payload.vocab_id,
-            UserProgress.cycle_no == cycle_no,
-        )
-    )
-    progress = db.execute(progress_stmt).scalar_one_or_none()
-    if progress is None:
-        progress = UserProgress(user_id=payload.user_id, vocab_id=payload.vocab_id, cycle_no=cycle_no)
-        db.add(progress)
-        db.flush()
-
-    # Update Leitner scheduling
-    current_level = int(progress.leitner_level or 1)
-
-    if payload.grade == "again":
-        new_level = 1
-        next_date = today
-        progress.correct_streak = 0
-        progress.wrong_count = int(progress.wrong_count or 0) + 1
-    elif payload.grade == "good":
-        new_level = min(current_level + 1, LEITNER_MAX_LEVEL)
-        next_date = next_review_date_for_level(new_level, today=today)
-        progress.correct_streak = int(progress.correct_streak or 0) + 1
-    else:  # perfect
-        new_level = min(current_level + 1, LEITNER_MAX_LEVEL)
-        next_date = next_review_date_for_level(new_level, today=today)
-        progress.correct_streak = int(progress.correct_streak or 0) + 1
-
-    progress.leitner_level = new_level
-    progress.next_review_date = next_date
-    progress.last_reviewed_at = now
-    progress.updated_at = now
-    progress.is_mastered = new_level >= LEITNER_MAX_LEVEL
-
-    db.add(
-        StudyLog(
-            user_id=payload.user_id,
-            vocab_id=payload.vocab_id,
-            difficulty_level=vocab.difficulty_level,
-            cycle_no=cycle_no,
-            result=payload.grade,
-            studied_at=now,
-        )
+    return ReviewOut(
+        user_id=payload.user_id,
+        vocab_id=payload.vocab_id,
+        grade=payload.grade,
+        leitner_level=progress.leitner_level,
+        next_review_date=progress.next_review_date,
+        is_mastered=progress.is_mastered,
+        studied_at=now,
     )
 
+
+@api_router.post("/review/quiz", response_model=QuizAnswerOut)
+def submit_quiz_answer(payload: QuizAnswerIn, db: Session = Depends(get_db)):
+    require_user(db, payload.user_id)
+
+    vocab = db.get(Vocab, payload.vocab_id)
+    if vocab is None:
+        raise HTTPException(status_code=404, detail="vocab not found")
+
+    # 보기는 정답 + 이 카드의 오답 후보 중에서만 나온다
+    choice_ids = [vocab.id, *(cid for cid, _ in _quiz_candidates(db, vocab.id))]
+    choice = _resolve_choice(payload.choice_id, user_id=payload.user_id, vocab_id=vocab.id, choice_ids=choice_ids)
+    if choice is None:
+        raise HTTPException(status_code=400, detail="choice was not offered for this card")
+    correct = choice == vocab.id
+    grade = "good" if correct else "again"
+
+    now = datetime.utcnow()
+    progress = apply_review(db, user_id=payload.user_id, vocab=vocab, grade=grade, now=now)
+
     db.commit()
 
-    return ReviewOut(
+    return QuizAnswerOut(
         user_id=payload.user_id,
         vocab_id=payload.vocab_id,
-        grade=payload.grade,
+        grade=grade,
         leitner_level=progress.leitner_level,
         next_review_date=progress.next_review_date,
         is_mastered=progress.is_mastered,
         studied_at=now,
+        correct=correct,
+        answer_vocab_id=vocab.id,
+    )
+
+
+@api_router.post("/sync", response_model=SyncOut)
+def sync(payload: SyncIn, db: Session = Depends(get_db)):
+    require_user(db, payload.user_id)
+
+    server_now = datetime.utcnow()
+
+    # 적용 순서: 클라이언트 시각 -> idempotency_key (어느 기기가 먼저 올려도 같은 결과)
+    reviews = sorted(
+        payload.reviews,
+        key=lambda r: (min(to_utc_naive(r.reviewed_at), server_now), r.idempotency_key),
+    )
+
+    keys = [r.idempotency_key for r in reviews]
+    seen = set(
+        db.execute(
+            select(SyncReceipt.idempotency_key).where(
+                and_(SyncReceipt.user_id == payload.user_id, SyncReceipt.idempotency_key.in_(keys))
+            )
+        ).scalars()
+    )
+
+    vocab_ids = {r.vocab_id for r in reviews}
+    vocabs = {v.id: v for v in db.execute(select(Vocab).where(Vocab.id.in_(vocab_ids))).scalars()}
+
+    applied: list[str] = []
+    stale: list[str] = []
+    duplicates: list[str] = []
+    rejected: list[str] = []
+    for review in reviews:
+        if review.idempotency_key in seen:
+            duplicates.append(review.idempotency_key)
+            continue
+        seen.add(review.idempotency_key)
+
+        vocab = vocabs.get(review.vocab_id)
+        if vocab is None:
+            rejected.append(review.idempotency_key)
+            continue
+
+        # 미래 시각은 서버 시각으로 자른다
+        reviewed_at = min(to_utc_naive(review.reviewed_at), server_now)
+        progress = apply_review(
+            db,
+            user_id=payload.user_id,
+            vocab=vocab,
+            grade=review.grade,
+            now=reviewed_at,
+            today=reviewed_at.date(),
+        )
+        was_applied = progress.last_reviewed_at == reviewed_at
+        (applied if was_applied else stale).append(review.idempotency_key)
+
+        db.add(
+            SyncReceipt(
+                user_id=payload.user_id,
+                idempotency_key=review.idempotency_key,
+                vocab_id=vocab.id,
+                result=review.grade,
+                reviewed_at=reviewed_at,
+                applied=was_applied,
+            )
+        )
+
+    db.commit()
+
+    # cursor 를 먼저 읽어야 이후 커밋된 변경을 다음 동기화에서 놓치지 않는다
+    cursor = current_change_seq(db, payload.user_id)
+    since = payload.cursor if payload.cursor is not None else -1
+
+    progress_rows = db.execute(
+        select(UserProgress)
+        .where(
+            and_(
+                UserProgress.user_id == payload.user_id,
+                UserProgress.change_seq > since,
+                UserProgress.change_seq <= cursor,
+            )
+        )
+        .order_by(UserProgress.change_seq.asc(), UserProgress.id.asc())
+    ).scalars()
+    day_rows = db.execute(
+        select(LevelDayProgress)
+        .where(
+            and_(
+                LevelDayProgress.user_id == payload.user_id,
+                LevelDayProgress.change_seq > since,
+                LevelDayProgress.change_seq <= cursor,
+            )
+        )
+        .order_by(LevelDayProgress.change_seq.asc(), LevelDayProgress.id.asc())
+    ).scalars()
+
+    return SyncOut(
+        user_id=payload.user_id,
+        cursor=cursor,
+        applied=applied,
+        stale=stale,
+        duplicates=duplicates,
+        rejected=rejected,
+        progress=[SyncProgressOut.model_validate(p) for p in progress_rows],
+        days=[SyncDayOut.model_validate(d) for d in day_rows],
+    )
+
+
+@api_router.get("/leaderboard", response_model=LeaderboardOut)
+def get_leaderboard(
+    difficulty_level: LevelValue = Query(...),
+    metric: LeaderboardMetric = Query("mastered"),
+    cohort_id: int | None = Query(None),
+    limit: int = Query(10, ge=1, le=TOP_K),
+    db: Session = Depends(get_read_db),
+):
+    # 집계 쿼리 없이 메모리의 top-K 만 읽는다 (app.leaderboard)
+    week, best = leaderboards.top(difficulty_level=difficulty_level, metric=metric, cohort_id=cohort_id, limit=limit)
+
+    names = {}
+    if best:
+        ids = [user_id for user_id, _ in best]
+        names = dict(db.execute(select(User.id, User.username).where(User.id.in_(ids))).tuples().all())
+
+    return LeaderboardOut(
+        difficulty_level=difficulty_level,
+        cohort_id=cohort_id,
+        metric=metric,
+        week_start=week,
+        entries=[
+            LeaderboardEntryOut(rank=i, user_id=user_id, username=names.get(user_id), score=score)
+            for i, (user_id, score) in enumerate(best, start=1)
+        ],
+    )
+
+
+@api_router.get("/reviews/forecast", response_model=ForecastOut)
+def get_review_forecast(
+    user_id: int | None = Query(None),
+    difficulty_level: LevelValue | None = Query(None),
+    days: int = Query(FORECAST_DAYS, ge=1, le=FORECAST_DAYS),
+    db: Session = Depends(get_read_db),
+):
+    # user_id 가 없으면 전체 사용자 합계 (워커별로 미리 집계해 둔 값)
+    if user_id is None:
+        start, counts = system_forecast.counts(difficulty_level=difficulty_level)
+    else:
+        require_user(db, user_id)
+        start = date.today()
+        rows = due_counts(
+            db, end=start + timedelta(days=days), user_id=user_id, difficulty_level=difficulty_level
+        )
+        counts = daily_counts(rows, start=start)
+
+    levels = []
+    for level in sorted(counts):
+        per_day = counts[level][:days]
+        levels.append(ForecastLevelOut(difficulty_level=level, counts=per_day, total=sum(per_day)))
+    return ForecastOut(user_id=user_id, start_date=start, days=days, levels=levels)
+
+
+@api_router.get("/progress/history", response_model=ProgressHistoryOut)
+def get_progress_history(
+    user_id: int = Query(...),
+    difficulty_level: str | None = Query(None),
+    db: Session = Depends(get_read_db),
+):
+    require_user(db, user_id)
+
+    stmt = select(UserProgressArchive).where(UserProgressArchive.user_id == user_id)
+    if difficulty_level is not None:
+        stmt = stmt.where(UserProgressArchive.difficulty_level == difficulty_level)
+    stmt = stmt.order_by(UserProgressArchive.difficulty_level.asc(), UserProgressArchive.cycle_no.asc())
+
+    # payload 는 상세 조회에서만 푼다
+    cycles = db.execute(stmt.options(defer(UserProgressArchive.payload))).scalars()
+    return ProgressHistoryOut(user_id=user_id, cycles=[ArchivedCycleOut.model_validate(c) for c in cycles])
+
+
+@api_router.get("/progress/history/{difficulty_level}/{cycle_no}", response_model=ArchivedCycleDetailOut)
+def get_progress_history_cycle(
+    difficulty_level: str,
+    cycle_no: int,
+    user_id: int = Query(...),
+    db: Session = Depends(get_read_db),
+):
+    require_user(db, user_id)
+
+    archive = db.execute(
+        select(UserProgressArchive).where(
+            and_(
+                UserProgressArchive.user_id == user_id,
+                UserProgressArchive.difficulty_level == difficulty_level,
+                UserProgressArchive.cycle_no == cycle_no,
+            )
+        )
+    ).scalar_one_or_none()
+    if archive is None:
+        raise HTTPException(status_code=404, detail="archived cycle not found")
+
+    return ArchivedCycleDetailOut(
+        user_id=user_id,
+        difficulty_level=archive.difficulty_level,
+        cycle_no=archive.cycle_no,
+        row_count=archive.row_count,
+        mastered_count=archive.mastered_count,
+        archived_at=archive.archived_at,
+        progress=[ArchivedProgressOut.model_validate(row) for row in decode_rows(archive.payload)],
     )
 
 
 @api_router.post("/levels/day/complete", response_model=CompleteDayOut)
 def complete_day(payload: CompleteDayIn, db: Session = Depends(get_db)):
-    user = db.get(User, payload.user_id)
-    if user is None:
-        raise HTTPException(status_code=404, detail="user not found")
+    require_user(db, payload.user_id)
 
-    cycle = _get_or_create_active_cycle(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level)
-    _ensure_day_rows(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=cycle.cycle_no)
+    cycle = get_or_create_active_cycle(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level)
+    ensure_day_rows(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=cycle.cycle_no)
 
-    open_day = _get_open_day(
+    open_day = get_open_day(
         db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=cycle.cycle_no
     )
     if open_day is None:
         raise HTTPException(status_code=400, detail="no open day")
 
-    total_vocab = db.execute(
-        select(func.count(Vocab.id)).where(
-            and_(Vocab.difficulty_level == payload.difficulty_level, Vocab.day == open_day.day)
-        )
-    ).scalar_one()
+    total_vocab = cache.get(
+        f"vocab:day_count:{payload.difficulty_level}:{open_day.day}",
+        lambda: db.execute(
+            select(func.count(Vocab.id)).where(
+                and_(Vocab.difficulty_level == payload.difficulty_level, Vocab.day == open_day.day)
+            )
+        ).scalar_one(),
+    )
     progressed_vocab = db.execute(
         select(func.count(UserProgress.id))
         .join(Vocab, UserProgress.vocab_id == Vocab.id)
@@ -541,6 +767,8 @@ def complete_day(payload: CompleteDayIn, db: Session = Depends(get_db)):
     open_day.status = "completed"
     open_day.completed_at = datetime.utcnow()
     db.add(open_day)
+    # autoflush 가 꺼져 있으므로 아래 completed 집계 전에 반영
+    db.flush()
 
     cycle_status = cycle.status
     completed_days = db.execute(
@@ -560,6 +788,7 @@ def complete_day(payload: CompleteDayIn, db: Session = Depends(get_db)):
         cycle_status = cycle.status
         db.add(cycle)
 
+    cache.invalidate_after_commit(db, level_key(payload.user_id, payload.difficulty_level))
     db.commit()
     return CompleteDayOut(
         user_id=payload.user_id,
@@ -573,12 +802,10 @@ def complete_day(payload: CompleteDayIn, db: Session = Depends(get_db)):
 
 @api_router.post("/levels/cycle/confirm", response_model=ConfirmCycleOut)
 def confirm_cycle(payload: ConfirmCycleIn, db: Session = Depends(get_db)):
-    user = db.get(User, payload.user_id)
-    if user is None:
-        raise HTTPException(status_code=404, detail="user not found")
+    require_user(db, payload.user_id)
 
-    cycle = _get_or_create_active_cycle(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level)
-    _ensure_day_rows(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=cycle.cycle_no)
+    cycle = get_or_create_active_cycle(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level)
+    ensure_day_rows(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=cycle.cycle_no)
 
     if cycle.status != "completed_pending_confirm":
         raise HTTPException(status_code=400, detail="cycle is not ready to confirm")
@@ -588,16 +815,10 @@ def confirm_cycle(payload: ConfirmCycleIn, db: Session = Depends(get_db)):
     db.flush()
 
     new_cycle_no = int(cycle.cycle_no) + 1
-    new_cycle = LevelCycle(
-        user_id=payload.user_id,
-        difficulty_level=payload.difficulty_level,
-        cycle_no=new_cycle_no,
-        status="active",
-    )
-    db.add(new_cycle)
-    db.flush()
+    upsert_cycle(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=new_cycle_no)
 
-    _ensure_day_rows(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=new_cycle_no)
+    ensure_day_rows(db, user_id=payload.user_id, difficulty_level=payload.difficulty_level, cycle_no=new_cycle_no)
+    cache.invalidate_after_commit(db, level_key(payload.user_id, payload.difficulty_level))
     db.commit()
 
     return ConfirmCycleOut(
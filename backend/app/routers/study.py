@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import logging
+import math
+from datetime import datetime
+
+import anyio
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..admission import write_limiter
+from ..db import SessionLocal
+from ..models import Vocab
+from ..reviews import apply_review, card_out, open_day_no, read_cycle, require_user, select_today_card
+from ..schemas import CardOut, LevelValue, ReviewOut, StudyMessageOut, StudyReviewIn
+
+study_router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class StudySession:
+    """One WebSocket connection's study loop.
+
+    The user, cycle and open day are resolved once at connect. Each review is
+    committed in its own short transaction, so no write lock is held while
+    waiting on the socket.
+    """
+
+    def __init__(self, db: Session, *, user_id: int, difficulty_level: str):
+        self.db = db
+        self.user_id = user_id
+        self.difficulty_level = difficulty_level
+        self.cycle_no = 1
+        self.day = 1
+
+    def start(self) -> CardOut | None:
+        require_user(self.db, self.user_id)
+        cycle = read_cycle(self.db, user_id=self.user_id, difficulty_level=self.difficulty_level)
+        day = open_day_no(
+            self.db, user_id=self.user_id, difficulty_level=self.difficulty_level, cycle_no=cycle.cycle_no
+        )
+        if day is None:
+            raise HTTPException(status_code=400, detail="today learning day is not open")
+        self.cycle_no, self.day = cycle.cycle_no, day
+        return self.next_card()
+
+    def next_card(self) -> CardOut | None:
+        card = select_today_card(
+            self.db,
+            user_id=self.user_id,
+            difficulty_level=self.difficulty_level,
+            cycle_no=self.cycle_no,
+            day=self.day,
+        )
+        # 읽기 트랜잭션을 붙잡고 있지 않는다
+        self.db.commit()
+        return card_out(card) if card is not None else None
+
+    def review(self, payload: StudyReviewIn) -> tuple[ReviewOut, CardOut | None]:
+        try:
+            vocab = self.db.get(Vocab, payload.vocab_id)
+            if vocab is None:
+                raise HTTPException(status_code=404, detail="vocab not found")
+
+            now = datetime.utcnow()
+            # 세션 레벨의 카드면 연결 시 읽어 둔 사이클을 그대로 쓴다
+            cycle_no = self.cycle_no if vocab.difficulty_level == self.difficulty_level else None
+            progress = apply_review(
+                self.db, user_id=self.user_id, vocab=vocab, grade=payload.grade, now=now, cycle_no=cycle_no
+            )
+            review = ReviewOut(
+                user_id=self.user_id,
+                vocab_id=vocab.id,
+                grade=payload.grade,
+                leitner_level=progress.leitner_level,
+                next_review_date=progress.next_review_date,
+                is_mastered=progress.is_mastered,
+                studied_at=now,
+            )
+            self.db.commit()
+            return review, self.next_card()
+        except (HTTPException, SQLAlchemyError):
+            self.db.rollback()
+            raise
+
+    def close(self) -> None:
+        try:
+            # 실패한 flush/commit 뒤에는 commit 할 수 없는 상태이므로 되돌린다
+            if self.db.in_transaction():
+                self.db.rollback()
+        finally:
+            self.db.close()
+
+
+def _card_message(card: CardOut | None, review: ReviewOut | None = None) -> dict:
+    message = StudyMessageOut(type="card" if card is not None else "done", review=review, card=card)
+    return message.model_dump(mode="json")
+
+
+def _error_message(detail: str, *, retry_after: int | None = None) -> dict:
+    return StudyMessageOut(type="error", detail=detail, retry_after=retry_after).model_dump(mode="json")
+
+
+@study_router.websocket("/study/ws")
+async def study_session(
+    websocket: WebSocket,
+    user_id: int = Query(...),
+    difficulty_level: LevelValue = Query(...),
+):
+    # 메시지: {"vocab_id": 1, "grade": "good"} -> {"type": "card", "review": {...}, "card": {...}}
+    await websocket.accept()
+    session = StudySession(SessionLocal(), user_id=user_id, difficulty_level=difficulty_level)
+    try:
+        try:
+            card = await run_in_threadpool(session.start)
+        except HTTPException as exc:
+            # 4xxx: HTTP 상태 코드 + 4000
+            await websocket.close(code=4000 + exc.status_code, reason=str(exc.detail))
+            return
+        except SQLAlchemyError:
+            await websocket.close(code=1011, reason="database error")
+            return
+        await websocket.send_json(_card_message(card))
+
+        while True:
+            text = await websocket.receive_text()
+            try:
+                payload = StudyReviewIn.model_validate_json(text)
+            except ValidationError as exc:
+                await websocket.send_json(_error_message(str(exc.errors()[0]["msg"])))
+                continue
+
+            # HTTP 리뷰(AdmissionMiddleware)와 같은 사용자별 token bucket
+            wait = write_limiter.take(user_id)
+            if wait > 0:
+                await websocket.send_json(_error_message("rate limit exceeded", retry_after=max(1, math.ceil(wait))))
+                continue
+
+            try:
+                review, card = await run_in_threadpool(session.review, payload)
+            except HTTPException as exc:
+                await websocket.send_json(_error_message(str(exc.detail)))
+                continue
+            except SQLAlchemyError:
+                logger.warning("study session review failed", exc_info=True)
+                await websocket.send_json(_error_message("database error"))
+                continue
+            await websocket.send_json(_card_message(card, review))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # 연결이 끊겨 태스크가 취소되어도 세션은 정리한다
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(session.close)
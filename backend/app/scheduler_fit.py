@@ -0,0 +1,351 @@
+"""Offline fitting of scheduler parameters from study_logs (NumPy, all users at once).
+
+Every review after a card's first one is an observation: `elapsed` days since
+the previous review, the memory strength the scheduler assigned at that
+previous review, and whether the answer was recalled (grade != "again").
+Histories are replayed step by step, vectorized across all cards, with batch
+versions of the app.schedulers rules. interval_scale is then fitted per group
+((user, level), level, global) by minimizing log loss of
+recall_probability(elapsed, strength * interval_scale) over a log-spaced grid;
+the loss is computed once per (user, level) and summed for the wider scopes.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .leitner import LEITNER_INTERVAL_DAYS, LEITNER_MAX_LEVEL
+from .models import StudyLog
+from .schedulers import (
+    FORGETTING_DECAY,
+    FORGETTING_FACTOR,
+    FSRSScheduler,
+    Scheduler,
+    SM2Scheduler,
+)
+
+GRADES = ("again", "good", "perfect")
+SCALE_GRID = np.exp(np.linspace(np.log(0.2), np.log(5.0), 81))
+# 같은 날 다시 보는 재학습은 장기 기억 예측과 무관하므로 제외
+MIN_ELAPSED_DAYS = 0.5
+_P_CLIP = 1e-4
+
+
+@dataclass
+class ReviewEvents:
+    """study_logs as columns, grouped by card (user, vocab, cycle) in review order."""
+
+    user_id: np.ndarray
+    level: np.ndarray  # index into `levels`
+    levels: list[str | None]
+    card: np.ndarray
+    grade: np.ndarray  # index into GRADES
+    day: np.ndarray  # days since epoch (float)
+
+    def __len__(self) -> int:
+        return len(self.card)
+
+
+def load_events(sessions: Iterable[Session], *, batch_size: int = 100_000) -> ReviewEvents:
+    """Stream study_logs from each session (one per shard) into NumPy arrays."""
+    stmt = (
+        select(
+            StudyLog.user_id,
+            StudyLog.vocab_id,
+            StudyLog.cycle_no,
+            StudyLog.difficulty_level,
+            StudyLog.result,
+            StudyLog.studied_at,
+        )
+        .order_by(StudyLog.user_id, StudyLog.vocab_id, StudyLog.cycle_no, StudyLog.studied_at, StudyLog.id)
+        .execution_options(yield_per=batch_size)
+    )
+    grade_codes = {g: i for i, g in enumerate(GRADES)}
+    level_codes: dict[str | None, int] = {}
+    chunks: list[tuple[np.ndarray, ...]] = []
+    for db in sessions:
+        for rows in db.execute(stmt).partitions():
+            user_id, vocab_id, cycle_no, level, result, studied_at = zip(*rows)
+            chunks.append(
+                (
+                    np.array(user_id, dtype=np.int64),
+                    np.array(vocab_id, dtype=np.int64),
+                    np.array(cycle_no, dtype=np.int64),
+                    np.array([level_codes.setdefault(v, len(level_codes)) for v in level], dtype=np.int32),
+                    np.array([grade_codes.get(r, 1) for r in result], dtype=np.int8),
+                    np.array(studied_at, dtype="datetime64[us]").astype(np.int64) / 86_400_000_000,
+                )
+            )
+
+    if not chunks:
+        empty = np.zeros(0, dtype=np.int64)
+        return ReviewEvents(empty, empty.astype(np.int32), [], empty, empty.astype(np.int8), empty.astype(float))
+
+    user_id, vocab_id, cycle_no, level, grade, day = (np.concatenate(c) for c in zip(*chunks))
+    # shard 간 사용자는 겹치지 않으므로 이어 붙여도 카드별로 연속된다
+    new_card = np.ones(len(user_id), dtype=bool)
+    new_card[1:] = (user_id[1:] != user_id[:-1]) | (vocab_id[1:] != vocab_id[:-1]) | (cycle_no[1:] != cycle_no[:-1])
+    card = np.cumsum(new_card) - 1
+    return ReviewEvents(user_id, level, list(level_codes), card, grade, day)
+
+
+def recall_probability(elapsed: np.ndarray, strength: np.ndarray) -> np.ndarray:
+    return (1 + FORGETTING_FACTOR * elapsed / strength) ** FORGETTING_DECAY
+
+
+# --- batch versions of app.schedulers (state per card, updated for a subset of cards) ---
+
+
+class LeitnerBatch:
+    def __init__(self, n_cards: int, params: dict[str, float]):
+        self.level = np.ones(n_cards, dtype=np.int64)
+        self.intervals = np.array([0] + [LEITNER_INTERVAL_DAYS[i] for i in range(1, LEITNER_MAX_LEVEL + 1)], float)
+
+    def strength(self, c: np.ndarray) -> np.ndarray:
+        return self.intervals[self.level[c]]
+
+    def update(self, c: np.ndarray, grade: np.ndarray, elapsed: np.ndarray) -> None:
+        self.level[c] = np.where(grade == 0, 1, np.minimum(self.level[c] + 1, LEITNER_MAX_LEVEL))
+
+
+class SM2Batch:
+    def __init__(self, n_cards: int, params: dict[str, float]):
+        self.p = params
+        self.ease = np.zeros(n_cards)
+        self.interval = np.zeros(n_cards)
+        self.reps = np.zeros(n_cards, dtype=np.int64)
+        self.quality = np.array([SM2Scheduler.QUALITY[g] for g in GRADES], dtype=float)
+
+    def strength(self, c: np.ndarray) -> np.ndarray:
+        interval = self.interval[c]
+        return np.where(interval > 0, interval, self.p["first_interval"])
+
+    def update(self, c: np.ndarray, grade: np.ndarray, elapsed: np.ndarray) -> None:
+        p = self.p
+        q = self.quality[grade]
+        ease = np.where(self.ease[c] > 0, self.ease[c], p["initial_ease"])
+        failed = q < 3
+        reps = self.reps[c]
+        grown = np.round(self.interval[c] * ease)
+        interval = np.where(reps == 0, p["first_interval"], np.where(reps == 1, p["second_interval"], grown))
+        self.interval[c] = np.where(failed, p["first_interval"], interval)
+        self.reps[c] = np.where(failed, 0, reps + 1)
+        self.ease[c] = np.maximum(p["min_ease"], ease + 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
+
+
+class FSRSBatch:
+    def __init__(self, n_cards: int, params: dict[str, float]):
+        self.w = np.array([params[f"w{i}"] for i in range(17)])
+        self.stability = np.zeros(n_cards)
+        self.difficulty = np.zeros(n_cards)
+        self.rating = np.array([FSRSScheduler.RATING[g] for g in GRADES], dtype=float)
+
+    def _initial_difficulty(self, rating: np.ndarray) -> np.ndarray:
+        w = self.w
+        return w[4] - (rating - 3) * w[5]
+
+    def strength(self, c: np.ndarray) -> np.ndarray:
+        s = self.stability[c]
+        return np.where(s > 0, s, self.w[2])
+
+    def update(self, c: np.ndarray, grade: np.ndarray, elapsed: np.ndarray) -> None:
+        w = self.w
+        g = self.rating[grade]
+        s = self.stability[c]
+        d = self.difficulty[c]
+        first = np.isnan(elapsed) | (s <= 0)
+        # 첫 리뷰 행은 아래 계산 결과를 쓰지 않지만 경고가 나지 않도록 안전한 값으로 채운다
+        s_ = np.where(first, 1.0, s)
+        d_ = np.where(first, 5.0, d)
+        r = recall_probability(np.where(first, 0.0, elapsed), s_)
+
+        lapse = w[11] * d_ ** -w[12] * ((s_ + 1) ** w[13] - 1) * np.exp(w[14] * (1 - r))
+        bonus = np.where(g == 4, w[16], 1.0)
+        growth = np.exp(w[8]) * (11 - d_) * s_ ** -w[9] * (np.exp(w[10] * (1 - r)) - 1)
+        stability = np.where(g == 1, lapse, s_ * (1 + growth * bonus))
+        difficulty = d_ - w[6] * (g - 3)
+        difficulty = w[7] * self._initial_difficulty(np.array(4.0)) + (1 - w[7]) * difficulty
+
+        stability = np.where(first, w[(g - 1).astype(np.int64)], stability)
+        difficulty = np.where(first, self._initial_difficulty(g), difficulty)
+        self.stability[c] = np.maximum(0.1, stability)
+        self.difficulty[c] = np.clip(difficulty, 1.0, 10.0)
+
+
+BATCHES = {"leitner": LeitnerBatch, "sm2": SM2Batch, "fsrs": FSRSBatch}
+
+
+def step_index(card: np.ndarray) -> np.ndarray:
+    """Position of each event within its card's history (0 = first review)."""
+    starts = np.flatnonzero(np.r_[True, card[1:] != card[:-1]])
+    counts = np.diff(np.r_[starts, len(card)])
+    return np.arange(len(card)) - np.repeat(starts, counts)
+
+
+def replay(events: ReviewEvents, scheduler: Scheduler, params: dict[str, float]) -> tuple[np.ndarray, np.ndarray]:
+    """Returns (elapsed days, strength at previous review) per event; NaN for first reviews."""
+    n = len(events)
+    elapsed = np.full(n, np.nan)
+    strength = np.full(n, np.nan)
+    if not n:
+        return elapsed, strength
+
+    batch = BATCHES[scheduler.name](int(events.card[-1]) + 1, params)
+    steps = step_index(events.card)
+    order = np.argsort(steps, kind="stable")
+    bounds = np.searchsorted(steps[order], np.arange(steps.max() + 2))
+
+    # 카드마다 k 번째 리뷰를 한꺼번에 처리 (반복 횟수 = 카드당 최대 리뷰 수)
+    for k in range(len(bounds) - 1):
+        idx = order[bounds[k] : bounds[k + 1]]
+        c = events.card[idx]
+        if k:
+            strength[idx] = batch.strength(c)
+            elapsed[idx] = events.day[idx] - events.day[idx - 1]
+        batch.update(c, events.grade[idx], elapsed[idx])
+    return elapsed, strength
+
+
+def loss_matrix(
+    elapsed: np.ndarray, strength: np.ndarray, recalled: np.ndarray, groups: np.ndarray, n_groups: int
+) -> np.ndarray:
+    """Log loss per (group, SCALE_GRID value)."""
+    x = FORGETTING_FACTOR * elapsed / strength
+    x_ok, g_ok = x[recalled], groups[recalled]
+    x_miss, g_miss = x[~recalled], groups[~recalled]
+    loss = np.empty((n_groups, len(SCALE_GRID)))
+    for j, scale in enumerate(SCALE_GRID):
+        # -log p = -DECAY * log1p(x / scale)
+        ok = np.bincount(g_ok, weights=np.log1p(x_ok / scale), minlength=n_groups) * -FORGETTING_DECAY
+        p_miss = np.minimum((1 + x_miss / scale) ** FORGETTING_DECAY, 1 - _P_CLIP)
+        miss = np.bincount(g_miss, weights=-np.log1p(-p_miss), minlength=n_groups)
+        loss[:, j] = ok + miss
+    return loss
+
+
+def best_scale(loss: np.ndarray) -> np.ndarray:
+    """Grid argmin refined by a parabola through the neighbouring grid points (in log space)."""
+    best = np.clip(np.argmin(loss, axis=1), 1, len(SCALE_GRID) - 2)
+    rows = np.arange(len(loss))
+    left, mid, right = loss[rows, best - 1], loss[rows, best], loss[rows, best + 1]
+    curvature = left - 2 * mid + right
+    offset = np.where(curvature > 0, 0.5 * (left - right) / np.where(curvature > 0, curvature, 1), 0.0)
+    step = np.log(SCALE_GRID[1]) - np.log(SCALE_GRID[0])
+    return np.exp(np.log(SCALE_GRID[best]) + np.clip(offset, -1, 1) * step)
+
+
+def calibration_rmse(
+    predicted: np.ndarray, recalled: np.ndarray, groups: np.ndarray | None = None, n_groups: int = 1, bins: int = 20
+) -> np.ndarray:
+    """RMSE between mean predicted and observed recall over predicted-probability bins, per group."""
+    if groups is None:
+        groups = np.zeros(len(predicted), dtype=np.int64)
+    cell = groups * bins + np.minimum((predicted * bins).astype(np.int64), bins - 1)
+    size = n_groups * bins
+    count = np.bincount(cell, minlength=size).reshape(n_groups, bins)
+    pred = np.bincount(cell, weights=predicted, minlength=size).reshape(n_groups, bins)
+    obs = np.bincount(cell, weights=recalled.astype(float), minlength=size).reshape(n_groups, bins)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sq = np.where(count > 0, (pred - obs) ** 2 / np.maximum(count, 1), 0.0)
+        return np.sqrt(sq.sum(axis=1) / np.maximum(count.sum(axis=1), 1))
+
+
+@dataclass
+class FittedParams:
+    user_id: int | None
+    difficulty_level: str | None
+    params: dict[str, float]
+    review_count: int
+    rmse: float
+
+
+@dataclass
+class FitReport:
+    events: int
+    observations: int
+    # (user, level) 그룹별 예측 vs 실제 회상률 RMSE 의 가중 평균
+    rmse_default: float
+    rmse_fitted: float
+    fitted: list[FittedParams]
+
+
+def fit_scheduler(events: ReviewEvents, scheduler: Scheduler, *, min_reviews: int = 50) -> FitReport:
+    """Fit interval_scale globally, per level, and per (user, level).
+
+    Only scopes with at least `min_reviews` observations are returned.
+    """
+    elapsed, strength = replay(events, scheduler, scheduler.params())
+    mask = ~np.isnan(elapsed) & (elapsed >= MIN_ELAPSED_DAYS)
+    elapsed, strength = elapsed[mask], strength[mask]
+    recalled = events.grade[mask] != 0
+    user_id, level = events.user_id[mask], events.level[mask]
+    n = len(elapsed)
+    if not n:
+        return FitReport(len(events), 0, float("nan"), float("nan"), [])
+
+    fitted: list[FittedParams] = []
+
+    def record(scale, counts, rmse, keys) -> None:
+        for g, (u, lvl) in enumerate(keys):
+            if lvl is not None and events.levels[lvl] is None:
+                # 레벨 없는 단어는 전체 값으로 충분하다
+                continue
+            fitted.append(
+                FittedParams(
+                    user_id=u,
+                    difficulty_level=events.levels[lvl] if lvl is not None else None,
+                    params={"interval_scale": round(float(scale[g]), 4)},
+                    review_count=int(counts[g]),
+                    rmse=float(rmse[g]),
+                )
+            )
+
+    # (user, level) 그룹별 손실을 한 번만 계산하고 level/전체는 그 합으로 구한다
+    n_levels = len(events.levels)
+    keys, group = np.unique(user_id * n_levels + level, return_inverse=True)
+    group = group.ravel()
+    n_groups = len(keys)
+    key_user, key_level = keys // n_levels, keys % n_levels
+    counts = np.bincount(group, minlength=n_groups)
+    loss = loss_matrix(elapsed, strength, recalled, group, n_groups)
+
+    global_scale = best_scale(loss.sum(axis=0, keepdims=True))
+    global_rmse = calibration_rmse(recall_probability(elapsed, strength * global_scale[0]), recalled)
+    if n >= min_reviews:
+        record(global_scale, [n], global_rmse, [(None, None)])
+
+    level_loss = np.zeros((n_levels, len(SCALE_GRID)))
+    np.add.at(level_loss, key_level, loss)
+    level_counts = np.bincount(level, minlength=n_levels)
+    level_scale = best_scale(level_loss)
+    level_rmse = calibration_rmse(recall_probability(elapsed, strength * level_scale[level]), recalled, level, n_levels)
+    present = np.flatnonzero(level_counts >= min_reviews)
+    record(level_scale[present], level_counts[present], level_rmse[present], [(None, int(i)) for i in present])
+
+    # 관측이 적은 그룹은 저장하지 않는다 (온라인에서 더 넓은 범위의 값을 쓴다)
+    level_scale = np.where(level_counts >= min_reviews, level_scale, global_scale[0] if n >= min_reviews else 1.0)
+    user_scale = np.where(counts >= min_reviews, best_scale(loss), level_scale[key_level])
+    predicted = recall_probability(elapsed, strength * user_scale[group])
+    user_rmse = calibration_rmse(predicted, recalled, group, n_groups)
+    enough = np.flatnonzero(counts >= min_reviews)
+    record(
+        user_scale[enough],
+        counts[enough],
+        user_rmse[enough],
+        [(int(key_user[g]), int(key_level[g])) for g in enough],
+    )
+
+    # 보고용: (user, level) 그룹별 RMSE 의 관측 수 가중 평균
+    default_rmse = calibration_rmse(recall_probability(elapsed, strength), recalled, group, n_groups)
+    return FitReport(
+        events=len(events),
+        observations=n,
+        rmse_default=float(np.average(default_rmse, weights=counts)),
+        rmse_fitted=float(np.average(user_rmse, weights=counts)),
+        fitted=fitted,
+    )
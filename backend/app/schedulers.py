@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, replace
+from typing import Mapping, NamedTuple
+
+from .leitner import LEITNER_INTERVAL_DAYS, LEITNER_MAX_LEVEL, clamp_level
+
+# 모든 스케줄러가 공유하는 망각 곡선 (FSRS 4.5): 기억 강도 S 일이 지나면 회상률 90%
+FORGETTING_DECAY = -0.5
+FORGETTING_FACTOR = 19 / 81
+
+
+def recall_probability(elapsed_days: float, strength_days: float) -> float:
+    return (1 + FORGETTING_FACTOR * elapsed_days / strength_days) ** FORGETTING_DECAY
+
+
+def level_for_interval(days: float) -> int:
+    """Leitner box whose interval best matches `days` (keeps leitner_level meaningful for every scheduler)."""
+    level = 1
+    for candidate, interval in sorted(LEITNER_INTERVAL_DAYS.items()):
+        if days >= interval:
+            level = candidate
+    return level
+
+
+@dataclass(slots=True)
+class CardState:
+    leitner_level: int = 1
+    interval_days: float = 0.0
+    ease_factor: float = 0.0
+    stability: float = 0.0
+    difficulty: float = 0.0
+    correct_streak: int = 0
+    wrong_count: int = 0
+
+
+class Scheduled(NamedTuple):
+    state: CardState
+    due_days: int
+
+    @property
+    def is_mastered(self) -> bool:
+        return self.state.leitner_level >= LEITNER_MAX_LEVEL
+
+
+def _due(days: float, params: Mapping[str, float]) -> int:
+    # interval_scale: fit_scheduler_params.py 가 사용자/레벨별로 학습하는 보정값
+    return max(1, round(days * params["interval_scale"]))
+
+
+class Scheduler:
+    """Turns a review grade into the card's next state and due date.
+
+    `elapsed_days` is None for the first review of a card. Implementations must
+    stay in step with the vectorized replay in app.scheduler_fit.
+    """
+
+    name: str
+    default_params: dict[str, float] = {"interval_scale": 1.0}
+
+    def params(self, fitted: Mapping[str, float] | None = None) -> dict[str, float]:
+        return {**self.default_params, **(fitted or {})}
+
+    def review(
+        self, state: CardState, grade: str, *, elapsed_days: float | None, params: Mapping[str, float]
+    ) -> Scheduled:
+        raise NotImplementedError
+
+    def strength(self, state: CardState) -> float:
+        """Days until recall drops to 90%, before interval_scale."""
+        raise NotImplementedError
+
+
+class LeitnerScheduler(Scheduler):
+    """The original 5-box scheme: "good" and "perfect" both move the card up one box."""
+
+    name = "leitner"
+
+    def review(self, state, grade, *, elapsed_days, params):
+        if grade == "again":
+            new = replace(state, leitner_level=1, correct_streak=0, wrong_count=state.wrong_count + 1)
+            return Scheduled(new, 0)
+
+        level = clamp_level(state.leitner_level + 1)
+        new = replace(
+            state,
+            leitner_level=level,
+            interval_days=float(LEITNER_INTERVAL_DAYS[level]),
+            correct_streak=state.correct_streak + 1,
+        )
+        return Scheduled(new, _due(LEITNER_INTERVAL_DAYS[level], params))
+
+    def strength(self, state):
+        return float(LEITNER_INTERVAL_DAYS[clamp_level(state.leitner_level)])
+
+
+class SM2Scheduler(Scheduler):
+    """SuperMemo-2. correct_streak is the repetition count n."""
+
+    name = "sm2"
+    default_params = {
+        "interval_scale": 1.0,
+        "initial_ease": 2.5,
+        "min_ease": 1.3,
+        "first_interval": 1.0,
+        "second_interval": 6.0,
+    }
+    QUALITY = {"again": 1, "good": 4, "perfect": 5}
+
+    def review(self, state, grade, *, elapsed_days, params):
+        q = self.QUALITY[grade]
+        ease = state.ease_factor or params["initial_ease"]
+        ease = max(params["min_ease"], ease + 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
+
+        if q < 3:
+            interval = params["first_interval"]
+            new = replace(
+                state,
+                ease_factor=ease,
+                interval_days=interval,
+                leitner_level=1,
+                correct_streak=0,
+                wrong_count=state.wrong_count + 1,
+            )
+            return Scheduled(new, 0)
+
+        if state.correct_streak == 0:
+            interval = params["first_interval"]
+        elif state.correct_streak == 1:
+            interval = params["second_interval"]
+        else:
+            interval = float(round(state.interval_days * (state.ease_factor or params["initial_ease"])))
+        due = _due(interval, params)
+        new = replace(
+            state,
+            ease_factor=ease,
+            interval_days=interval,
+            leitner_level=level_for_interval(due),
+            correct_streak=state.correct_streak + 1,
+        )
+        return Scheduled(new, due)
+
+    def strength(self, state):
+        return state.interval_days or self.default_params["first_interval"]
+
+
+# FSRS 4.5 기본 가중치 (w0..w16)
+FSRS_DEFAULT_WEIGHTS = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+)  # fmt: skip
+
+
+class FSRSScheduler(Scheduler):
+    """FSRS-style stability/difficulty model (ratings: again=1, good=3, perfect=4)."""
+
+    name = "fsrs"
+    default_params = {"interval_scale": 1.0, **{f"w{i}": w for i, w in enumerate(FSRS_DEFAULT_WEIGHTS)}}
+    RATING = {"again": 1, "good": 3, "perfect": 4}
+
+    @staticmethod
+    def initial_difficulty(rating: int, w: Mapping[str, float]) -> float:
+        return w["w4"] - (rating - 3) * w["w5"]
+
+    def review(self, state, grade, *, elapsed_days, params):
+        w = params
+        g = self.RATING[grade]
+
+        if elapsed_days is None or not state.stability:
+            stability = w[f"w{g - 1}"]
+            difficulty = self.initial_difficulty(g, w)
+        else:
+            s, d = state.stability, state.difficulty
+            r = recall_probability(elapsed_days, s)
+            if g == 1:
+                stability = w["w11"] * d ** -w["w12"] * ((s + 1) ** w["w13"] - 1) * math.exp(w["w14"] * (1 - r))
+            else:
+                bonus = w["w16"] if g == 4 else 1.0
+                growth = math.exp(w["w8"]) * (11 - d) * s ** -w["w9"] * (math.exp(w["w10"] * (1 - r)) - 1)
+                stability = s * (1 + growth * bonus)
+            difficulty = d - w["w6"] * (g - 3)
+            difficulty = w["w7"] * self.initial_difficulty(4, w) + (1 - w["w7"]) * difficulty
+        stability = max(0.1, stability)
+        difficulty = min(10.0, max(1.0, difficulty))
+
+        if g == 1:
+            new = replace(
+                state,
+                stability=stability,
+                difficulty=difficulty,
+                interval_days=stability,
+                leitner_level=1,
+                correct_streak=0,
+                wrong_count=state.wrong_count + 1,
+            )
+            return Scheduled(new, 0)
+
+        # 목표 회상률 90% 에서 간격 = stability
+        due = _due(stability, params)
+        new = replace(
+            state,
+            stability=stability,
+            difficulty=difficulty,
+            interval_days=stability,
+            leitner_level=level_for_interval(due),
+            correct_streak=state.correct_streak + 1,
+        )
+        return Scheduled(new, due)
+
+    def strength(self, state):
+        return state.stability or self.default_params["w2"]
+
+
+SCHEDULERS: dict[str, Scheduler] = {s.name: s for s in (LeitnerScheduler(), SM2Scheduler(), FSRSScheduler())}
+
+
+def get_scheduler(name: str) -> Scheduler:
+    try:
+        return SCHEDULERS[name]
+    except KeyError:
+        raise ValueError(f"unknown scheduler: {name}") from None
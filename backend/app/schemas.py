@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import Literal
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class VocabOut(BaseModel):
@@ -51,6 +51,22 @@ class ReviewOut(BaseModel):
     studied_at: datetime
 
 
+class StudyReviewIn(BaseModel):
+    # WebSocket /study/ws 로 보내는 메시지 (user_id 는 연결 시 한 번만)
+    vocab_id: int
+    grade: ReviewGrade
+
+
+class StudyMessageOut(BaseModel):
+    # card: 다음 카드, done: 오늘 카드 없음, error: 메시지 처리 실패 (연결은 유지)
+    type: Literal["card", "done", "error"]
+    review: ReviewOut | None = None
+    card: CardOut | None = None
+    detail: str | None = None
+    # 요청 제한에 걸린 경우 다시 보내도 되는 시각까지의 초 (HTTP 429 의 Retry-After)
+    retry_after: int | None = None
+
+
 LevelValue = Literal["600", "800", "900"]
 
 
@@ -108,3 +124,191 @@ class ConfirmCycleOut(BaseModel):
     user_id: int
     difficulty_level: LevelValue
     new_cycle_no: int
+
+
+class QuizChoiceOut(BaseModel):
+    # 서명된 불투명 토큰: 보기의 vocab_id 를 노출하지 않는다
+    choice_id: str
+    meaning: str
+
+
+class QuizCardOut(BaseModel):
+    vocab_id: int
+    difficulty_level: str | None
+    day: int | None
+    topic: str | None
+    word: str
+    example_en: str | None
+    choices: list[QuizChoiceOut]
+    leitner_level: int | None = None
+    next_review_date: date | None = None
+    is_mastered: bool | None = None
+
+
+class QuizAnswerIn(BaseModel):
+    user_id: int
+    vocab_id: int
+    choice_id: str
+
+
+class QuizAnswerOut(ReviewOut):
+    correct: bool
+    answer_vocab_id: int
+
+
+class PackOut(BaseModel):
+    difficulty_level: str
+    day: int
+    url: str
+    sha256: str
+    size: int
+    word_count: int
+    audio_count: int
+
+
+class PacksOut(BaseModel):
+    generated_at: datetime
+    packs: list[PackOut]
+
+
+class SyncReviewIn(BaseModel):
+    idempotency_key: str = Field(min_length=1, max_length=64)
+    vocab_id: int
+    grade: ReviewGrade
+    reviewed_at: datetime
+
+
+class SyncIn(BaseModel):
+    user_id: int
+    # 마지막으로 받은 cursor, 없으면 전체 상태를 내려준다
+    cursor: int | None = None
+    reviews: list[SyncReviewIn] = Field(default_factory=list, max_length=1000)
+
+
+class SyncProgressOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    vocab_id: int
+    cycle_no: int
+    leitner_level: int
+    next_review_date: date | None
+    is_mastered: bool
+    last_reviewed_at: datetime | None
+    correct_streak: int
+    wrong_count: int
+    change_seq: int
+
+
+class SyncDayOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    difficulty_level: str
+    cycle_no: int
+    day: int
+    status: str
+    opened_at: datetime | None
+    completed_at: datetime | None
+    change_seq: int
+
+
+class SyncOut(BaseModel):
+    user_id: int
+    cursor: int
+    applied: list[str]
+    stale: list[str]
+    duplicates: list[str]
+    rejected: list[str]
+    progress: list[SyncProgressOut]
+    days: list[SyncDayOut]
+
+
+class ArchivedCycleOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    difficulty_level: str
+    cycle_no: int
+    row_count: int
+    mastered_count: int
+    archived_at: datetime
+
+
+class ArchivedProgressOut(BaseModel):
+    vocab_id: int
+    leitner_level: int
+    next_review_date: date | None
+    is_mastered: bool
+    last_reviewed_at: datetime | None
+    correct_streak: int
+    wrong_count: int
+
+
+class ProgressHistoryOut(BaseModel):
+    user_id: int
+    cycles: list[ArchivedCycleOut]
+
+
+class ArchivedCycleDetailOut(ArchivedCycleOut):
+    user_id: int
+    progress: list[ArchivedProgressOut]
+
+
+class ProvisionUserIn(BaseModel):
+    username: str = Field(min_length=1, max_length=50)
+    # 이미 해시된 값 (평문 비밀번호를 받지 않는다)
+    password_hash: str = Field(min_length=1, max_length=255)
+
+
+class ProvisionIn(BaseModel):
+    cohort: str | None = Field(None, min_length=1, max_length=100)
+    users: list[ProvisionUserIn] = Field(min_length=1, max_length=10000)
+
+
+class EnrollIn(BaseModel):
+    user_ids: list[int] = Field(min_length=1, max_length=10000)
+
+
+class ProvisionOut(BaseModel):
+    cohort_id: int | None
+    created: int
+    existing: int
+    enrolled: int
+    # 미리 만든 level_cycles / level_day_progress 행 수
+    cycles_created: int
+    days_created: int
+    user_ids: list[int]
+
+
+class ForecastLevelOut(BaseModel):
+    difficulty_level: str
+    # counts[0] = 오늘 (밀린 복습 포함), counts[i] = 오늘 + i 일
+    counts: list[int]
+    total: int
+
+
+class ForecastOut(BaseModel):
+    user_id: int | None
+    start_date: date
+    days: int
+    levels: list[ForecastLevelOut]
+
+
+ExportTable = Literal["study_logs", "user_progress"]
+ExportFormat = Literal["ndjson", "csv"]
+
+
+LeaderboardMetric = Literal["mastered", "week_reviews"]
+
+
+class LeaderboardEntryOut(BaseModel):
+    rank: int
+    user_id: int
+    username: str | None
+    score: int
+
+
+class LeaderboardOut(BaseModel):
+    difficulty_level: LevelValue
+    cohort_id: int | None
+    metric: LeaderboardMetric
+    week_start: date
+    entries: list[LeaderboardEntryOut]
@@ -25,6 +25,44 @@ class Settings(BaseSettings):
 
     cors_allow_origins: str = "*"
 
+    # nginx 가 /voca/uploads/ 로 정적 제공하는 디렉터리 (infra/nginx-voca.conf)
+    uploads_dir: str = str(Path(__file__).resolve().parent.parent / "uploads")
+
+    # 프로세스 로컬 캐시 (멀티 워커에서는 무효화 버스로 동기화)
+    cache_enabled: bool = False
+    cache_transport: str = "table"  # table | uds
+    cache_socket_dir: str = "/tmp/toeic_voca_cache"
+    cache_ttl_seconds: float = 300.0
+    cache_poll_interval_seconds: float = 0.5
+
+    # 쓰기 API 사용자별 제한 (워커 프로세스 단위, app.admission)
+    write_rate_per_second: float = 5.0
+    write_burst: int = 20
+    write_max_concurrent_per_user: int = 2
+
+    # /api/admin 용 X-Admin-Token (비어 있으면 관리자 API 비활성)
+    admin_token: str = ""
+
+    # 퀴즈 보기 토큰(HMAC) 서명 키. 비어 있으면 프로세스마다 임의 키 (워커가 여러 개면 반드시 설정)
+    quiz_token_secret: str = ""
+
+    # 리더보드: 다른 워커의 갱신/새 코호트 멤버를 반영하는 주기 (0 = 시작 시 한 번만)
+    leaderboard_refresh_seconds: float = 60.0
+
+    # 전체 복습 예정 집계(/reviews/forecast)를 DB 에서 다시 읽는 주기. 사이에는 리뷰마다 증분 갱신
+    forecast_refresh_seconds: float = 300.0
+
+    # 복습 스케줄러: leitner | sm2 | fsrs (app.schedulers)
+    scheduler: str = "leitner"
+
+    # 사용자별 학습 상태를 N 개의 SQLite 파일로 분산 (0 = 단일 DB)
+    shard_count: int = 0
+    shard_url_template: str = "sqlite:///./toeic_voca_shard{shard}.db"
+
+    @property
+    def uploads_url(self) -> str:
+        return f"{self.base_path.rstrip('/')}/uploads"
+
     @property
     def database_url(self) -> str:
         # SQLite 사용 (개발용)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .db import dialect_insert
+from .models import LevelDayProgress, UserProgress, UserSyncState
+
+# change_seq 를 갖는 사용자 상태 테이블 (POST /sync 의 delta 대상)
+SYNCED_MODELS = (UserProgress, LevelDayProgress)
+
+
+def next_change_seq(session: Session, user_id: int) -> int:
+    """Allocate the next change sequence number for a user (one round trip)."""
+    stmt = dialect_insert(session, UserSyncState).values(user_id=user_id, last_seq=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserSyncState.user_id],
+        set_={"last_seq": UserSyncState.last_seq + 1},
+    ).returning(UserSyncState.last_seq)
+    return int(session.connection().execute(stmt).scalar_one())
+
+
+def current_change_seq(session: Session, user_id: int) -> int:
+    seq = session.execute(select(UserSyncState.last_seq).where(UserSyncState.user_id == user_id)).scalar_one_or_none()
+    return int(seq or 0)
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    # DB 는 naive UTC 로 저장한다 (datetime.utcnow 와 동일)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_change_seq(session: Session, flush_context, instances) -> None:
+    pending: dict[int, list] = {}
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, SYNCED_MODELS):
+            continue
+        if obj not in session.new and not session.is_modified(obj, include_collections=False):
+            continue
+        pending.setdefault(obj.user_id, []).append(obj)
+
+    # flush 하나당 사용자별로 순번 하나
+    for user_id, objs in pending.items():
+        seq = next_change_seq(session, user_id)
+        for obj in objs:
+            obj.change_seq = seq
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sys
+
+from app.archive import archive_confirmed_cycles
+from app.db import shard_sessions
+
+
+def main() -> int:
+    # Usage: python archive_progress.py [max-cycles-per-shard]
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    cycles = rows = 0
+    for db in shard_sessions():
+        shard_cycles, shard_rows = archive_confirmed_cycles(db, limit=limit)
+        cycles += shard_cycles
+        rows += shard_rows
+
+    print(f"Archived {rows} user_progress rows from {cycles} confirmed cycles")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
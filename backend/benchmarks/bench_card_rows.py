@@ -0,0 +1,161 @@
+"""ORM entities vs. Core column rows for the card read path.
+
+For deck sizes 1..1000 cards, each "request" opens a Session, selects the
+user's due cards joined with vocab and builds CardOut for every row:
+
+- orm:  select(UserProgress, Vocab) -> identity-mapped entities (the old path)
+- core: select(<CardOut columns>) -> app.reviews.CardRow named tuples
+
+Reports mean CPU time per request and tracemalloc peak per request.
+
+Usage (from backend/): python benchmarks/bench_card_rows.py [--repeat 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import and_, create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.models import Base, User, UserProgress, Vocab  # noqa: E402
+from app.reviews import PROGRESS_CARD_COLUMNS, VOCAB_CARD_COLUMNS, CardRow, card_out  # noqa: E402
+from app.schemas import CardOut, VocabOut  # noqa: E402
+
+DECK_SIZES = (1, 10, 100, 1000)
+
+
+def _seed(engine, deck_sizes) -> dict[int, int]:
+    """One user per deck size with that many due cards. Returns {deck size: user_id}."""
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    biggest = max(deck_sizes)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Vocab),
+            [
+                {
+                    "difficulty_level": "600",
+                    "day": i % 30 + 1,
+                    "topic": "office",
+                    "word": f"word{i}",
+                    "meaning": f"뜻 {i}",
+                    "example_en": f"An example sentence for word{i}.",
+                    "example_kr": f"word{i} 예문",
+                    "created_at": now,
+                }
+                for i in range(biggest)
+            ],
+        )
+        users = {}
+        for size in deck_sizes:
+            user_id = conn.execute(
+                insert(User).values(username=f"deck{size}", password_hash="x", created_at=now).returning(User.id)
+            ).scalar_one()
+            users[size] = user_id
+            conn.execute(
+                insert(UserProgress),
+                [
+                    {
+                        "user_id": user_id,
+                        "vocab_id": vocab_id,
+                        "cycle_no": 1,
+                        "leitner_level": 2,
+                        "next_review_date": date.today() - timedelta(days=1),
+                        "last_reviewed_at": now,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for vocab_id in range(1, size + 1)
+                ],
+            )
+    return users
+
+
+def _due_filter(user_id: int):
+    return and_(
+        UserProgress.user_id == user_id,
+        UserProgress.cycle_no == 1,
+        UserProgress.is_mastered.is_(False),
+        UserProgress.next_review_date <= date.today(),
+    )
+
+
+def orm_path(engine, user_id: int) -> list[CardOut]:
+    with Session(engine) as db:
+        rows = db.execute(
+            select(UserProgress, Vocab)
+            .join(Vocab, UserProgress.vocab_id == Vocab.id)
+            .where(_due_filter(user_id))
+            .order_by(UserProgress.next_review_date.asc(), UserProgress.id.asc())
+        ).all()
+        return [
+            CardOut(
+                vocab=VocabOut.model_validate(vocab),
+                leitner_level=progress.leitner_level,
+                next_review_date=progress.next_review_date,
+                is_mastered=progress.is_mastered,
+            )
+            for progress, vocab in rows
+        ]
+
+
+def core_path(engine, user_id: int) -> list[CardOut]:
+    with Session(engine) as db:
+        rows = db.execute(
+            select(*VOCAB_CARD_COLUMNS, *PROGRESS_CARD_COLUMNS)
+            .select_from(UserProgress)
+            .join(Vocab, UserProgress.vocab_id == Vocab.id)
+            .where(_due_filter(user_id))
+            .order_by(UserProgress.next_review_date.asc(), UserProgress.id.asc())
+        ).all()
+        return [card_out(CardRow(*row)) for row in rows]
+
+
+def _measure(fn, engine, user_id: int, repeat: int) -> tuple[float, int]:
+    fn(engine, user_id)  # warm-up (statement cache, connection pool)
+
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(engine, user_id)
+    cpu = (time.process_time() - start) / repeat
+
+    tracemalloc.start()
+    fn(engine, user_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        users = _seed(engine, DECK_SIZES)
+        assert orm_path(engine, users[10]) == core_path(engine, users[10])
+
+        print(f"{'cards':>6} {'orm ms':>9} {'core ms':>9} {'speedup':>8} {'orm KiB':>9} {'core KiB':>9}")
+        for size in DECK_SIZES:
+            repeat = max(5, args.repeat // max(1, size // 10))
+            orm_cpu, orm_peak = _measure(orm_path, engine, users[size], repeat)
+            core_cpu, core_peak = _measure(core_path, engine, users[size], repeat)
+            print(
+                f"{size:>6} {orm_cpu * 1000:>9.3f} {core_cpu * 1000:>9.3f} {orm_cpu / core_cpu:>7.2f}x "
+                f"{orm_peak / 1024:>9.1f} {core_peak / 1024:>9.1f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
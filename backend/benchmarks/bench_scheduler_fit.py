@@ -0,0 +1,105 @@
+"""Scheduler parameter fit time and recall calibration on synthetic review logs.
+
+Simulates users whose true memory strength differs from the scheduler's
+assumption by a per-user factor, reviews every card roughly when due, draws
+recall outcomes from the shared forgetting curve, then runs
+app.scheduler_fit.fit_scheduler on the resulting log. Reports fit time,
+predicted-vs-observed recall RMSE before/after fitting, and how well the
+per-user interval_scale recovers the true factor.
+
+Usage (from backend/): python benchmarks/bench_scheduler_fit.py [--users 4000] [--cards 100] [--reviews 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import get_args
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.scheduler_fit import BATCHES, ReviewEvents, fit_scheduler, recall_probability  # noqa: E402
+from app.schedulers import SCHEDULERS  # noqa: E402
+from app.schemas import LevelValue  # noqa: E402
+
+LEVELS = list(get_args(LevelValue))
+
+
+def simulate(name: str, users: int, cards: int, reviews: int, rng: np.random.Generator):
+    scheduler = SCHEDULERS[name]
+    n_cards = users * cards
+    true_scale = rng.lognormal(0.0, 0.4, users)
+    card_user = np.repeat(np.arange(users), cards)
+    batch = BATCHES[name](n_cards, scheduler.params())
+
+    all_cards = np.arange(n_cards)
+    day = np.empty((n_cards, reviews))
+    grade = np.empty((n_cards, reviews), dtype=np.int8)
+    day[:, 0] = rng.uniform(0, 30, n_cards)
+    elapsed = np.full(n_cards, np.nan)
+    for k in range(reviews):
+        if k:
+            strength = batch.strength(all_cards)
+            # 사용자는 대략 예정일 전후로 복습한다
+            elapsed = strength * rng.lognormal(0.0, 0.35, n_cards)
+            day[:, k] = day[:, k - 1] + elapsed
+            p = recall_probability(elapsed, strength * true_scale[card_user])
+        else:
+            p = np.full(n_cards, 0.7)
+        recalled = rng.random(n_cards) < p
+        grade[:, k] = np.where(recalled, np.where(rng.random(n_cards) < 0.3, 2, 1), 0)
+        batch.update(all_cards, grade[:, k], elapsed)
+
+    events = ReviewEvents(
+        user_id=np.repeat(card_user, reviews),
+        level=np.repeat(np.arange(n_cards) % len(LEVELS), reviews).astype(np.int32),
+        levels=list(LEVELS),
+        card=np.repeat(all_cards, reviews),
+        grade=grade.ravel(),
+        day=day.ravel(),
+    )
+    return events, true_scale
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=4000)
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--reviews", type=int, default=8, help="reviews per card")
+    parser.add_argument("--scheduler", action="append", choices=sorted(SCHEDULERS))
+    parser.add_argument("--min-reviews", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for name in args.scheduler or sorted(SCHEDULERS):
+        events, true_scale = simulate(name, args.users, args.cards, args.reviews, rng)
+
+        t0 = time.perf_counter()
+        report = fit_scheduler(events, SCHEDULERS[name], min_reviews=args.min_reviews)
+        elapsed = time.perf_counter() - t0
+
+        # 레벨마다 같은 진짜 값이므로 사용자별 평균과 비교
+        per_user: dict[int, list[float]] = {}
+        for f in report.fitted:
+            if f.user_id is not None:
+                per_user.setdefault(f.user_id, []).append(f.params["interval_scale"])
+        ids = np.array(sorted(per_user))
+        fitted_scale = np.array([np.mean(per_user[u]) for u in ids])
+        log_error = np.abs(np.log(fitted_scale) - np.log(true_scale[ids])) if len(ids) else np.array([np.nan])
+        corr = np.corrcoef(np.log(fitted_scale), np.log(true_scale[ids]))[0, 1] if len(ids) > 1 else float("nan")
+
+        print(
+            f"{name:8s} rows={len(events):>9,}  obs={report.observations:>9,}  fit={elapsed:6.2f}s  "
+            f"({len(events) / elapsed / 1e6:.2f}M rows/s)  "
+            f"recall RMSE {report.rmse_default:.4f} -> {report.rmse_fitted:.4f}  "
+            f"users fitted={len(ids)}  median |log scale err|={np.median(log_error):.3f}  corr={corr:.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
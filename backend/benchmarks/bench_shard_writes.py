@@ -0,0 +1,124 @@
+"""Review-write throughput vs. number of SQLite shards on one machine.
+
+Each worker process runs N review transactions (upsert user_progress +
+insert study_logs, then commit) for random users, routed with
+app.db.shard_for_user. With one shard every commit queues on the same
+SQLite write lock; with more shards, writers for different users proceed
+in parallel.
+
+The writes themselves are CPU-bound, so on a single core the rate stays flat
+whatever the shard count: there is nothing to run in parallel. --hold-ms
+keeps each transaction open that much longer after its writes, standing in
+for fsync latency on a real disk. That is the lock time sharding is meant to
+overlap, and it shows the scaling even on one core.
+
+Usage (from backend/): python benchmarks/bench_shard_writes.py [--workers 8] [--reviews 500] [--hold-ms 2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event, insert  # noqa: E402
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # noqa: E402
+
+from app.db import SHARDED_TABLES, shard_for_user  # noqa: E402
+from app.models import Base, StudyLog, UserProgress  # noqa: E402
+
+USERS = 10000
+VOCAB = 1500
+
+
+def _engine(path: str):
+    eng = create_engine(f"sqlite:///{path}", connect_args={"timeout": 60})
+
+    @event.listens_for(eng, "connect")
+    def _wal(dbapi_conn, _record):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+
+    return eng
+
+
+def _worker(paths: list[str], reviews: int, hold: float, seed: int, start, results) -> None:
+    engines = [_engine(p) for p in paths]
+    rng = random.Random(seed)
+    start.wait()
+
+    t0 = time.perf_counter()
+    for _ in range(reviews):
+        user_id = rng.randrange(1, USERS + 1)
+        vocab_id = rng.randrange(1, VOCAB + 1)
+        now = datetime.utcnow()
+        eng = engines[shard_for_user(user_id, len(engines))]
+        with eng.begin() as conn:
+            stmt = sqlite_insert(UserProgress).values(
+                user_id=user_id, vocab_id=vocab_id, cycle_no=1, leitner_level=2, next_review_date=date.today()
+            )
+            conn.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["user_id", "vocab_id", "cycle_no"],
+                    set_={"leitner_level": stmt.excluded.leitner_level, "updated_at": now},
+                )
+            )
+            conn.execute(
+                insert(StudyLog).values(
+                    user_id=user_id, vocab_id=vocab_id, difficulty_level="600", cycle_no=1, result="good"
+                )
+            )
+            if hold:
+                # 쓰기 잠금을 쥔 채로 기다린다 (디스크 fsync 대용)
+                time.sleep(hold)
+    results.put(time.perf_counter() - t0)
+
+
+def run(shards: int, workers: int, reviews: int, hold: float = 0.0) -> float:
+    tables = [t for t in Base.metadata.sorted_tables if t.name in SHARDED_TABLES]
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [str(Path(tmp) / f"shard{i}.db") for i in range(shards)]
+        for p in paths:
+            eng = _engine(p)
+            Base.metadata.create_all(bind=eng, tables=tables)
+            eng.dispose()
+
+        start = mp.Event()
+        results: mp.Queue = mp.Queue()
+        procs = [mp.Process(target=_worker, args=(paths, reviews, hold, i, start, results)) for i in range(workers)]
+        for proc in procs:
+            proc.start()
+        t0 = time.perf_counter()
+        start.set()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - t0
+    return workers * reviews / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--reviews", type=int, default=500, help="review transactions per worker")
+    parser.add_argument("--shards", default="1,2,4,8")
+    parser.add_argument("--hold-ms", type=float, default=0.0, help="extra time each transaction holds the lock")
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers x {args.reviews} reviews, hold {args.hold_ms:g} ms")
+    print(f"{'shards':>6}  {'reviews/s':>10}  {'speedup':>7}")
+    base = None
+    for shards in [int(s) for s in args.shards.split(",")]:
+        rate = run(shards, args.workers, args.reviews, args.hold_ms / 1000)
+        base = base or rate
+        print(f"{shards:>6}  {rate:>10.0f}  {rate / base:>6.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+"""Card-to-card latency: HTTP study loop vs. the /api/study/ws WebSocket session.
+
+Both flows run in-process through Starlette's TestClient against a fresh
+SQLite database with one open day of --cards cards:
+
+- http: POST /api/review, then GET /api/cards/today (two requests, two Sessions,
+        user/cycle/open-day lookups on every step)
+- ws:   send {"vocab_id", "grade"} and receive the next card on one connection
+        (context resolved once, each review committed in its own transaction)
+
+Reports mean / p50 / p95 milliseconds from one card arriving to the next.
+
+Usage (from backend/): python benchmarks/bench_study_ws.py [--cards 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+
+def _seed(cards: int) -> None:
+    from sqlalchemy import insert
+
+    from app.db import engine
+    from app.models import Base, User, Vocab
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"username": name, "password_hash": "x"} for name in ("http", "ws")])
+        conn.execute(
+            insert(Vocab),
+            [
+                {"difficulty_level": "600", "day": 1, "word": f"word{i}", "meaning": f"뜻 {i}"}
+                for i in range(cards)
+            ],
+        )
+
+
+def _summary(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    return f"{statistics.mean(ms):>8.3f} {statistics.median(ms):>8.3f} {p95:>8.3f}"
+
+
+def http_flow(client, user_id: int, steps: int) -> list[float]:
+    params = {"user_id": user_id, "difficulty_level": "600"}
+    card = client.get("/api/cards/today", params=params).json()
+    samples = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        client.post("/api/review", json={"user_id": user_id, "vocab_id": card["vocab"]["id"], "grade": "good"})
+        card = client.get("/api/cards/today", params=params).json()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def ws_flow(client, user_id: int, steps: int) -> list[float]:
+    samples = []
+    with client.websocket_connect(f"/api/study/ws?user_id={user_id}&difficulty_level=600") as ws:
+        card = ws.receive_json()["card"]
+        for _ in range(steps):
+            start = time.perf_counter()
+            ws.send_json({"vocab_id": card["vocab"]["id"], "grade": "good"})
+            card = ws.receive_json()["card"]
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=300)
+    args = parser.parse_args()
+    steps = args.cards - 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # settings.database_url 은 ./toeic_voca.db (현재 디렉터리 기준)
+        os.chdir(tmp)
+        os.environ["WRITE_BURST"] = str(args.cards * 10)
+        os.environ["WRITE_RATE_PER_SECOND"] = str(args.cards * 10)
+        _seed(args.cards)
+
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        with TestClient(app) as client:
+            for user_id in (1, 2):
+                client.post("/api/levels/day/open", json={"user_id": user_id, "difficulty_level": "600", "day": 1})
+
+            http = http_flow(client, 1, steps)
+            ws = ws_flow(client, 2, steps)
+
+        print(f"{'flow':>5} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}  ({steps} cards)")
+        print(f"{'http':>5} {_summary(http)}")
+        print(f"{'ws':>5} {_summary(ws)}")
+        print(f"speedup (mean): {statistics.mean(http) / statistics.mean(ws):.2f}x")
+        os.chdir(BACKEND)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
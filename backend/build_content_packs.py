@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from app.db import engine
+from app.packs import build_packs
+from app.settings import settings
+
+
+def main() -> int:
+    # Usage: python build_content_packs.py [--prune]
+    prune = "--prune" in sys.argv[1:]
+    uploads_dir = Path(settings.uploads_dir)
+
+    with engine.connect() as conn:
+        manifest = build_packs(conn, uploads_dir, prune=prune)
+
+    packs = manifest["packs"]
+    if not packs:
+        print("No vocab rows with difficulty_level/day found")
+        return 1
+
+    total = sum(p["size"] for p in packs)
+    print(f"Wrote {len(packs)} packs ({total} bytes) under {uploads_dir / 'packs'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
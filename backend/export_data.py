@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime
+
+from app.export import COLUMNS, FORMATS, export_stream
+from app.sync import to_utc_naive
+
+
+def _utc_time(value: str) -> datetime:
+    return to_utc_naive(datetime.fromisoformat(value))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stream study_logs / user_progress as NDJSON or CSV")
+    parser.add_argument("table", choices=sorted(COLUMNS))
+    parser.add_argument("-o", "--output", default="-", help="output file ('-' for stdout)")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--level", choices=("600", "800", "900"))
+    parser.add_argument("--cycle", type=int)
+    parser.add_argument("--since", type=_utc_time, help="ISO time, inclusive (naive = UTC)")
+    parser.add_argument("--until", type=_utc_time, help="ISO time, exclusive (naive = UTC)")
+    parser.add_argument("--include-archived", action="store_true", help="user_progress: add archived cycles")
+    args = parser.parse_args()
+
+    chunks = export_stream(
+        args.table,
+        args.format,
+        gzip=args.gzip,
+        user_id=args.user_id,
+        difficulty_level=args.level,
+        cycle_no=args.cycle,
+        since=args.since,
+        until=args.until,
+        include_archived=args.include_archived,
+    )
+    if args.output == "-":
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        return 0
+
+    size = 0
+    with open(args.output, "wb") as out:
+        for chunk in chunks:
+            out.write(chunk)
+            size += len(chunk)
+    print(f"Exported {args.table} to {args.output} ({size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, insert
+
+from app.cache import cache
+from app.db import SessionLocal, shard_sessions
+from app.models import SchedulerParams
+from app.scheduler_fit import fit_scheduler, load_events
+from app.schedulers import SCHEDULERS, get_scheduler
+from app.settings import settings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fit per-user/per-level scheduler parameters from study_logs")
+    parser.add_argument("--scheduler", default=settings.scheduler, choices=sorted(SCHEDULERS))
+    parser.add_argument("--min-reviews", type=int, default=50, help="observations needed for a per-user fit")
+    parser.add_argument("--dry-run", action="store_true", help="report only, do not store parameters")
+    args = parser.parse_args()
+
+    scheduler = get_scheduler(args.scheduler)
+
+    started = time.perf_counter()
+    events = load_events(shard_sessions(read_only=True))
+    loaded = time.perf_counter()
+    report = fit_scheduler(events, scheduler, min_reviews=args.min_reviews)
+    fitted = time.perf_counter()
+
+    print(f"Loaded {report.events} study_logs in {loaded - started:.1f}s, fitted in {fitted - loaded:.1f}s")
+    print(f"Observations: {report.observations}")
+    print(f"Recall RMSE: default {report.rmse_default:.4f} -> fitted {report.rmse_fitted:.4f}")
+    if args.dry_run or not report.fitted:
+        return 0
+
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        # 이전 결과를 통째로 교체 (NULL 범위 행은 unique 제약으로 막을 수 없으므로)
+        db.execute(delete(SchedulerParams).where(SchedulerParams.scheduler == scheduler.name))
+        db.execute(
+            insert(SchedulerParams),
+            [
+                {
+                    "scheduler": scheduler.name,
+                    "user_id": f.user_id,
+                    "difficulty_level": f.difficulty_level,
+                    "params": json.dumps(f.params),
+                    "review_count": f.review_count,
+                    "rmse": f.rmse,
+                    "fitted_at": now,
+                }
+                for f in report.fitted
+            ],
+        )
+        db.commit()
+    cache.invalidate(f"scheduler:{scheduler.name}")
+
+    print(f"Stored {len(report.fitted)} parameter sets for {scheduler.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
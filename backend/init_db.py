@@ -1,9 +1,18 @@
-from app.db import engine
+from app.db import SHARDED_TABLES, engine, shard_engines
 from app.models import Base
 
 
 def main() -> None:
-    Base.metadata.create_all(bind=engine)
+    if not shard_engines:
+        Base.metadata.create_all(bind=engine)
+        return
+
+    # catalog 에는 공용 테이블, 각 shard 에는 사용자별 학습 상태 테이블
+    catalog_tables = [t for t in Base.metadata.sorted_tables if t.name not in SHARDED_TABLES]
+    shard_tables = [t for t in Base.metadata.sorted_tables if t.name in SHARDED_TABLES]
+    Base.metadata.create_all(bind=engine, tables=catalog_tables)
+    for shard_engine in shard_engines:
+        Base.metadata.create_all(bind=shard_engine, tables=shard_tables)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from app.db import engine, shard_engines
+
+# 기존 DB 에 /reviews/forecast 용 covering index 를 추가한다 (여러 번 실행해도 안전)
+FORECAST_INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_user_progress_forecast "
+    "ON user_progress (user_id, is_mastered, next_review_date, cycle_no, vocab_id)"
+)
+
+
+def main() -> int:
+    for eng in shard_engines or [engine]:
+        with eng.begin() as conn:
+            conn.execute(text(FORECAST_INDEX))
+        print(f"ix_user_progress_forecast ready ({eng.url.database})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
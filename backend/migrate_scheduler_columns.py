@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from sqlalchemy import inspect, text
+
+from app.db import SHARDED_TABLES, engine, shard_engines
+from app.models import Base
+
+# 기존 DB 의 user_progress 에 app.schedulers 상태 컬럼을 추가한다 (여러 번 실행해도 안전)
+SCHEDULER_COLUMNS = ("interval_days", "ease_factor", "stability", "difficulty")
+
+
+def main() -> int:
+    # scheduler_params 는 catalog 테이블
+    catalog_tables = [t for t in Base.metadata.sorted_tables if t.name not in SHARDED_TABLES]
+    Base.metadata.create_all(bind=engine, tables=catalog_tables if shard_engines else None)
+
+    for eng in shard_engines or [engine]:
+        with eng.begin() as conn:
+            columns = {c["name"] for c in inspect(conn).get_columns("user_progress")}
+            for column in SCHEDULER_COLUMNS:
+                if column not in columns:
+                    conn.execute(text(f"ALTER TABLE user_progress ADD COLUMN {column} FLOAT NOT NULL DEFAULT 0"))
+                    print(f"Added user_progress.{column} ({eng.url.database})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from sqlalchemy import inspect, text
+
+from app.db import SHARDED_TABLES, engine, shard_engines
+from app.models import Base
+
+# 기존 DB 에 POST /sync 용 change_seq 컬럼/인덱스를 추가한다 (여러 번 실행해도 안전)
+SYNC_COLUMNS = {
+    "user_progress": "ix_user_progress_user_change_seq",
+    "level_day_progress": "ix_level_day_progress_user_change_seq",
+}
+
+
+def main() -> int:
+    # user_sync_state, sync_receipts 등 새 테이블 (shard 를 쓰면 catalog 에는 공용 테이블만)
+    catalog_tables = [t for t in Base.metadata.sorted_tables if t.name not in SHARDED_TABLES]
+    shard_tables = [t for t in Base.metadata.sorted_tables if t.name in SHARDED_TABLES]
+    Base.metadata.create_all(bind=engine, tables=catalog_tables if shard_engines else None)
+
+    for eng in shard_engines or [engine]:
+        if shard_engines:
+            Base.metadata.create_all(bind=eng, tables=shard_tables)
+        with eng.begin() as conn:
+            insp = inspect(conn)
+            for table, index_name in SYNC_COLUMNS.items():
+                columns = {c["name"] for c in insp.get_columns(table)}
+                if "change_seq" not in columns:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0"))
+                    print(f"Added {table}.change_seq ({eng.url.database})")
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} (user_id, change_seq)"))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from app.db import engine, shard_engines
+
+# 중복 행을 정리한 뒤 upsert(ON CONFLICT) 가 기대하는 unique 인덱스를 만든다.
+# 각 그룹에서 가장 진행된 상태의 행 하나만 남긴다 (여러 번 실행해도 안전).
+# 세 테이블 모두 사용자별 학습 상태라 shard 를 쓰면 각 shard 에서 실행한다.
+DEDUPE = [
+    (
+        "level_cycles",
+        "uq_level_cycles_user_level_cycle",
+        "user_id, difficulty_level, cycle_no",
+        """
+        CASE status
+            WHEN 'completed_confirmed' THEN 0
+            WHEN 'completed_pending_confirm' THEN 1
+            ELSE 2
+        END, id
+        """,
+    ),
+    (
+        "level_day_progress",
+        "uq_level_day_progress_user_level_cycle_day",
+        "user_id, difficulty_level, cycle_no, day",
+        """
+        CASE status
+            WHEN 'completed' THEN 0
+            WHEN 'open' THEN 1
+            ELSE 2
+        END, id
+        """,
+    ),
+    (
+        "user_progress",
+        "uq_user_progress_user_vocab_cycle",
+        "user_id, vocab_id, cycle_no",
+        """
+        CASE WHEN last_reviewed_at IS NULL THEN 1 ELSE 0 END,
+        last_reviewed_at DESC, updated_at DESC, id
+        """,
+    ),
+]
+
+
+def main() -> int:
+    for eng in shard_engines or [engine]:
+        with eng.begin() as conn:
+            for table, index_name, columns, keep_order in DEDUPE:
+                result = conn.execute(
+                    text(
+                        f"""
+                        DELETE FROM {table} WHERE id IN (
+                            SELECT id FROM (
+                                SELECT id, ROW_NUMBER() OVER (PARTITION BY {columns} ORDER BY {keep_order}) AS rn
+                                FROM {table}
+                            ) ranked
+                            WHERE rn > 1
+                        )
+                        """
+                    )
+                )
+                print(f"{table}: removed {result.rowcount} duplicate rows ({eng.url.database})")
+                conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table} ({columns})"))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,7 +6,9 @@ from pathlib import Path
 
 from sqlalchemy import text
 
+from app.cache import cache
 from app.db import engine
+from app.distractors import rebuild_distractors
 
 
 def _pick(row: dict[str, str], *keys: str) -> str | None:
@@ -78,8 +80,14 @@ def main() -> int:
 
     with engine.begin() as conn:
         conn.execute(stmt, rows)
+        # 퀴즈 모드용 오답 후보 테이블을 함께 갱신
+        distractors = rebuild_distractors(conn)
+
+    # 워커들이 캐시한 단어 데이터(day별 단어 수, 오답 후보) 무효화
+    cache.invalidate("vocab")
 
     print(f"Inserted {len(rows)} rows into vocab")
+    print(f"Rebuilt {distractors} quiz distractor rows")
     return 0
 
 
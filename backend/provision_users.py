@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+
+from app.db import SessionLocal
+from app.provisioning import provision
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk-create users and pre-create their level state")
+    parser.add_argument("csv_path", help="CSV with username,password_hash columns ('-' for stdin)")
+    parser.add_argument("--cohort", help="enroll every user in this cohort (created if missing)")
+    parser.add_argument("--no-materialize", action="store_true", help="skip pre-creating cycles/day rows")
+    args = parser.parse_args()
+
+    handle = sys.stdin if args.csv_path == "-" else open(args.csv_path, newline="", encoding="utf-8-sig")
+    with handle:
+        rows = [(r["username"].strip(), r["password_hash"].strip()) for r in csv.DictReader(handle)]
+    rows = [(username, password_hash) for username, password_hash in rows if username and password_hash]
+    if not rows:
+        print("No users to provision")
+        return 1
+
+    with SessionLocal() as db:
+        result = provision(db, rows, cohort=args.cohort, materialize=not args.no_materialize)
+
+    print(f"Users: {result.created} created, {result.existing} already existed")
+    if args.cohort:
+        print(f"Cohort {args.cohort} (id={result.cohort_id}): {result.enrolled} enrolled")
+    print(f"Pre-created {result.cycles_created} level cycles and {result.days_created} day rows")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
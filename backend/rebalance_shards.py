@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from app.db import SHARDED_TABLES, shard_for_user, shard_url
+from app.models import Base
+from app.settings import settings
+
+
+def _table_columns() -> dict[str, list[str]]:
+    # 자동 증가 id 는 shard 마다 따로 매겨지므로 옮길 때 새로 받는다
+    columns = {}
+    for table in Base.metadata.sorted_tables:
+        if table.name in SHARDED_TABLES:
+            columns[table.name] = [c.name for c in table.columns if not (c.primary_key and c.autoincrement is True)]
+    return columns
+
+
+def _user_ids(conn, tables) -> list[int]:
+    if not tables:
+        return []
+    return [r[0] for r in conn.exec_driver_sql(" UNION ".join(f"SELECT user_id FROM {t}" for t in tables))]
+
+
+def _count(conn, schema: str, table: str, user_id: int) -> int:
+    return conn.execute(text(f"SELECT COUNT(*) FROM {schema}.{table} WHERE user_id = :u"), {"u": user_id}).scalar_one()
+
+
+def _move_user(target_engine, source_path: str, user_id: int, columns: dict[str, list[str]]) -> None:
+    """Copy the user's rows into the target shard, verify, then delete them from the source.
+
+    In WAL mode a transaction over ATTACHed files is atomic per file only, so the
+    copy and the delete are separate commits. Re-running after an interruption is
+    safe: rows a previous run left in the target are replaced.
+    """
+    with target_engine.connect() as conn:
+        conn.exec_driver_sql("ATTACH DATABASE ? AS src", (source_path,))
+        try:
+            # 이전 실행이 중단되어 target 에 남은 행은 지우고 다시 복사
+            for table, cols in columns.items():
+                col_list = ", ".join(cols)
+                conn.execute(text(f"DELETE FROM main.{table} WHERE user_id = :u"), {"u": user_id})
+                conn.execute(
+                    text(f"INSERT INTO main.{table} ({col_list}) SELECT {col_list} FROM src.{table} WHERE user_id = :u"),
+                    {"u": user_id},
+                )
+            conn.commit()
+
+            for table in columns:
+                copied, original = _count(conn, "main", table, user_id), _count(conn, "src", table, user_id)
+                if copied != original:
+                    raise RuntimeError(f"user {user_id}: {table} copied {copied} of {original} rows")
+            conn.rollback()
+
+            for table in columns:
+                conn.execute(text(f"DELETE FROM src.{table} WHERE user_id = :u"), {"u": user_id})
+            conn.commit()
+        finally:
+            conn.exec_driver_sql("DETACH DATABASE src")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Move user rows to the shard chosen by the current SHARD_COUNT")
+    parser.add_argument("--from-count", type=int, default=0, help="previous SHARD_COUNT (scan its shard files too)")
+    parser.add_argument("--from-catalog", action="store_true", help="also move rows out of the unsharded catalog DB")
+    args = parser.parse_args()
+
+    if not settings.shard_count:
+        print("SHARD_COUNT is 0; nothing to rebalance into")
+        return 2
+
+    columns = _table_columns()
+    targets = [create_engine(shard_url(i)) for i in range(settings.shard_count)]
+    for target in targets:
+        Base.metadata.create_all(bind=target, tables=[t for t in Base.metadata.sorted_tables if t.name in columns])
+
+    # (url, 현재 shard 번호 또는 None)
+    sources: list[tuple[str, int | None]] = []
+    if args.from_catalog:
+        sources.append((settings.database_url, None))
+    sources += [(shard_url(i), i) for i in range(max(args.from_count, settings.shard_count))]
+
+    moved = 0
+    for url, shard in sources:
+        source_path = make_url(url).database
+        source = create_engine(url)
+        with source.connect() as conn:
+            existing = {r[0] for r in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            source_columns = {t: cols for t, cols in columns.items() if t in existing}
+            user_ids = _user_ids(conn, source_columns)
+        source.dispose()
+
+        for user_id in user_ids:
+            target = shard_for_user(user_id)
+            if target == shard:
+                continue
+            _move_user(targets[target], source_path, user_id, source_columns)
+            moved += 1
+
+    print(f"Moved {moved} users across {settings.shard_count} shards")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import datetime, time
+
+from sqlalchemy import and_, delete, func, insert, select
+
+from app.db import shard_sessions
+from app.leaderboard import week_start
+from app.models import StudyLog, UserProgress, UserProgressArchive, UserScore, Vocab
+
+
+def main() -> int:
+    # 리더보드 카운터(user_scores)를 원본 테이블에서 다시 계산한다.
+    # 처음 배포할 때 한 번, 또는 카운터가 어긋났을 때 (리뷰가 적은 시간에) 실행
+    week = week_start()
+    week_begin = datetime.combine(week, time.min)
+    now = datetime.utcnow()
+
+    total = 0
+    for db in shard_sessions():
+        scores: dict[tuple[int, str], list[int]] = {}
+
+        mastered = db.execute(
+            select(UserProgress.user_id, Vocab.difficulty_level, func.count())
+            .join(Vocab, UserProgress.vocab_id == Vocab.id)
+            .where(and_(UserProgress.is_mastered.is_(True), Vocab.difficulty_level.is_not(None)))
+            .group_by(UserProgress.user_id, Vocab.difficulty_level)
+        ).all()
+        archived = db.execute(
+            select(
+                UserProgressArchive.user_id,
+                UserProgressArchive.difficulty_level,
+                func.sum(UserProgressArchive.mastered_count),
+            ).group_by(UserProgressArchive.user_id, UserProgressArchive.difficulty_level)
+        ).all()
+        for user_id, level, count in [*mastered, *archived]:
+            scores.setdefault((user_id, level), [0, 0])[0] += int(count or 0)
+
+        reviews = db.execute(
+            select(StudyLog.user_id, StudyLog.difficulty_level, func.count())
+            .where(and_(StudyLog.studied_at >= week_begin, StudyLog.difficulty_level.is_not(None)))
+            .group_by(StudyLog.user_id, StudyLog.difficulty_level)
+        ).all()
+        for user_id, level, count in reviews:
+            scores.setdefault((user_id, level), [0, 0])[1] += int(count)
+
+        db.execute(delete(UserScore))
+        if scores:
+            db.execute(
+                insert(UserScore),
+                [
+                    {
+                        "user_id": user_id,
+                        "difficulty_level": level,
+                        "mastered_count": mastered_count,
+                        "week_start": week,
+                        "week_reviews": week_reviews,
+                        "updated_at": now,
+                    }
+                    for (user_id, level), (mastered_count, week_reviews) in scores.items()
+                ],
+            )
+        db.commit()
+        total += len(scores)
+
+    print(f"Rebuilt {total} user_scores rows (week of {week})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())